@@ -0,0 +1,79 @@
+"""Benchmark of the time taken to import the ebola_model package in a fresh
+interpreter, which checks that matplotlib, pandas, SALib and scipy.optimize
+are only imported when a function that needs them is called.
+
+Run from any directory with
+
+    python analytic_computation/benchmarks/import_time.py
+
+The script exits with status 1 if a deferred module is imported by any of
+the modules benchmarked, or if --max-ms is given and a median import time is
+above it.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = ('ebola_model', 'ebola_model.functions.probability',
+           'ebola_model.functions.intervention_combinations',
+           'ebola_model.functions.gsa',
+           'ebola_model.functions.local_sensitivity_analysis',
+           'ebola_model.functions.sobol')
+DEFERRED = ('matplotlib', 'pandas', 'SALib', 'scipy.optimize')
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import numpy
+middle = time.perf_counter()
+import {module}
+stop = time.perf_counter()
+print(json.dumps({{'numpy': middle - start, 'module': stop - middle,
+                  'deferred': [name for name in {deferred!r}
+                               if name in sys.modules]}}))
+"""
+
+
+def measure(module, repeats):
+    """Function imports a module in repeats fresh interpreters, returning the
+    median times in seconds to import numpy and then the module, and the
+    deferred modules that were imported.
+    """
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', SCRIPT.format(module=module,
+                                                 deferred=DEFERRED)],
+            check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output))
+    return (statistics.median(run['numpy'] for run in runs),
+            statistics.median(run['module'] for run in runs),
+            sorted(set().union(*(run['deferred'] for run in runs))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--repeats', type=int, default=5,
+                        help='number of fresh interpreters for each module')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='largest median import time allowed, after '
+                             'numpy, in milliseconds')
+    args = parser.parse_args()
+
+    failed = False
+    print('{:<50} {:>9} {:>9}  {}'.format('module', 'numpy ms', 'module ms',
+                                          'deferred modules imported'))
+    for module in MODULES:
+        numpy_time, module_time, deferred = measure(module, args.repeats)
+        slow = args.max_ms is not None and 1000*module_time > args.max_ms
+        failed = failed or slow or bool(deferred)
+        print('{:<50} {:>9.1f} {:>9.1f}  {}'.format(
+            module, 1000*numpy_time, 1000*module_time,
+            ', '.join(deferred) or '-'))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
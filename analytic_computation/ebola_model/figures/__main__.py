@@ -0,0 +1,142 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import importlib
+import os
+import pathlib
+import sys
+import numpy as np
+
+FIGURES = ('figure2', 'figure3a', 'figure3b', 'figureS1a', 'figureS1b',
+           'figureS2', 'figureS3', 'figureS4')
+FORMATS = ('png', 'pdf')
+
+
+def fingerprint(name):
+    """Function hashes the inputs of a figure, which are its own script, the
+    scripts of the functions package and the version of the package.
+
+    Parameters
+    ----------
+    name : str
+        Name of the figure
+
+    Returns
+    -------
+    str
+        Hexadecimal digest of the inputs
+    """
+    package = pathlib.Path(__file__).resolve().parent.parent
+    paths = [package / 'figures' / (name + '.py'),
+             package / 'version_info.py']
+    paths += sorted((package / 'functions').glob('*.py'))
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.relative_to(package).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build(name, output, force=False):
+    """Function builds a figure headlessly, writing the arrays returned by
+    its `compute` function to data.npz and each panel drawn by its `plot`
+    function to PNG and PDF files in a directory of output named after the
+    figure. The figure is skipped if its inputs are unchanged since it was
+    last built there.
+
+    Parameters
+    ----------
+    name : str
+        Name of the figure
+    output : str
+        Directory the figure is written to
+    force : bool
+        Whether to build the figure even if its inputs are unchanged
+
+    Returns
+    -------
+    tuple[str, str]
+        Name of the figure and whether it was 'built' or 'unchanged'
+    """
+    import matplotlib.pyplot as plt
+
+    module = importlib.import_module('ebola_model.figures.' + name)
+    directory = os.path.join(output, name)
+    key_path = os.path.join(directory, 'inputs.sha256')
+    paths = [os.path.join(directory, 'data.npz')]
+    paths += [os.path.join(directory, panel + '.' + fmt)
+              for panel in module.PANELS for fmt in FORMATS]
+    key = fingerprint(name)
+    if not force and all(os.path.exists(path) for path in paths + [key_path]):
+        with open(key_path) as file:
+            if file.read() == key:
+                return name, 'unchanged'
+
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(key_path):
+        os.remove(key_path)
+    np.savez(paths[0], **module.compute())
+    plt.close('all')
+    with np.load(paths[0]) as data:
+        module.plot(dict(data))
+    numbers = plt.get_fignums()
+    if len(numbers) != len(module.PANELS):
+        raise RuntimeError('{} drew {} figures for {} panels'.format(
+            name, len(numbers), len(module.PANELS)))
+    for panel, number in zip(module.PANELS, numbers):
+        for fmt in FORMATS:
+            plt.figure(number).savefig(
+                os.path.join(directory, panel + '.' + fmt))
+    plt.close('all')
+    with open(key_path, 'w') as file:
+        file.write(key)
+    return name, 'built'
+
+
+def main(argv=None):
+    """Function runs the command line interface, whose build command builds
+    the figures as separate jobs on a pool of processes.
+    """
+    parser = argparse.ArgumentParser(prog='python -m ebola_model.figures')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser(
+        'build', help='compute and render the figures without a display')
+    build_parser.add_argument(
+        'figures', nargs='*', metavar='figure',
+        help='figures to build, from {}, defaulting to all'.format(
+            ', '.join(FIGURES)))
+    build_parser.add_argument(
+        '-o', '--output', default=os.path.join('build', 'figures'),
+        help='directory the figures are written to')
+    build_parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of processes, defaulting to one per CPU')
+    build_parser.add_argument(
+        '-f', '--force', action='store_true',
+        help='build figures even if their inputs are unchanged')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.figures if name not in FIGURES]
+    if unknown:
+        parser.error('unknown figures: {}'.format(', '.join(unknown)))
+    names = args.figures or FIGURES
+    failed = False
+    with ProcessPoolExecutor(args.jobs or os.cpu_count()) as executor:
+        futures = {executor.submit(build, name, args.output, args.force): name
+                   for name in names}
+        for future in as_completed(futures):
+            try:
+                name, status = future.result()
+            except Exception as error:
+                name, status, failed = futures[future], 'failed', True
+                print('{}: failed ({})'.format(name, error), file=sys.stderr)
+                continue
+            print('{}: {}'.format(name, status))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
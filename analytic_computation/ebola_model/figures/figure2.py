@@ -1,39 +1,53 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from ebola_model.functions.cache import DiskCache
 from ebola_model.functions.probability import PMO
 from ebola_model.functions.local_sensitivity_analysis import LSA
 
+PANELS = ('figure2A', 'figure2B', 'figure2C', 'figure2D', 'figure2E',
+          'figure2F')
+SWEEPS = ('community_infections', 'funeral_infections', 'hospital_visitors',
+          'hcw_infections', 'hosp_pmo')
+
 model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
-lsa = LSA(model)
 r = model.variables()
 
-# Figure 2A
-lsa.plot_community_infections(r, h=0.6)
-
-# Figure 2B
-lsa.plot_funeral_infections(r, h=0.6)
-
-# Figure 2C
-lsa.plot_hospital_visitors(r, h=0.6)
-
-# Figure 2D
-lsa.plot_hcw_infections(r, h=0.6)
-
-# Figure 2E
-lsa.plot_hosp_pmo(r, h=0.6)
-
-# Figure 2F
-plt.figure(figsize = [8, 6])
-plt.bar([r'$R_{C}$', r'$p_{f}$', r'$R_V$', r'$R_W$', r'$1-p_h$'],
-        lsa.gradients_c, edgecolor='black')
-plt.ylabel(r'Local sensitivity $(\chi(\pi_C, \it{x}))$', fontsize=20, labelpad=10)
-plt.xlabel(r'Parameter $(\it{x})$', fontsize=20, labelpad=10)
-plt.xticks(fontsize=18)
-plt.yticks(np.linspace(0, 0.35, 8))
-ax = plt.gca()
-ax.set_yticklabels([0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35], fontsize=18)
-ax.spines['top'].set_visible(False)
-ax.spines['right'].set_visible(False)
-plt.tight_layout()
-plt.show()
+def compute():
+    """Function calculates the sweeps of figures 2A to 2E and the local
+    sensitivities of figure 2F.
+    """
+    lsa = LSA(model, cache=DiskCache())
+    data = {}
+    for sweep in SWEEPS:
+        p_c, p_h, x = getattr(lsa, sweep)(r, h=0.6)
+        data[sweep + '_p_c'], data[sweep + '_p_h'] = p_c, p_h
+        data[sweep + '_x'] = x
+    data['gradients_c'], data['gradients_h'] = lsa.elasticities(r, h=0.6)
+    return data
+
+def plot(data):
+    """Function plots figures 2A to 2F from the arrays returned by `compute`.
+    """
+    lsa = LSA(model)
+    for sweep in SWEEPS:
+        values = (data[sweep + '_p_c'], data[sweep + '_p_h'], data[sweep + '_x'])
+        getattr(lsa, 'plot_' + sweep)(r, h=0.6, values=values, show=False)
+
+    # Figure 2F
+    plt.figure(figsize = [8, 6])
+    plt.bar([r'$R_{C}$', r'$p_{f}$', r'$R_V$', r'$R_W$', r'$1-p_h$'],
+            data['gradients_c'], edgecolor='black')
+    plt.ylabel(r'Local sensitivity $(\chi(\pi_C, \it{x}))$', fontsize=20, labelpad=10)
+    plt.xlabel(r'Parameter $(\it{x})$', fontsize=20, labelpad=10)
+    plt.xticks(fontsize=18)
+    plt.yticks(np.linspace(0, 0.35, 8))
+    ax = plt.gca()
+    ax.set_yticklabels([0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35], fontsize=18)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    plt.tight_layout()
+
+if __name__ == '__main__':
+    plot(compute())
+    plt.show()
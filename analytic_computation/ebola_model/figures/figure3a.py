@@ -2,8 +2,14 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from ebola_model.functions import probability as p
+from ebola_model.functions.cache import DiskCache
 from ebola_model.functions import intervention_combinations as ic
 
+PANELS = ('figure3a',)
+
+model = p.PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+r = model.variables()
+
 def plot_results(matrix):
         matrix = np.flip(matrix, axis=0)
 
@@ -35,15 +41,25 @@ def plot_results(matrix):
                    fontsize=20, multialignment='center', labelpad=10)
 
         ax = plt.gca()
-        ax.set_xticks(np.linspace(0, len(c) - 1, 6))
+        ax.set_xticks(np.linspace(0, len(matrix) - 1, 6))
         ax.set_xticklabels([0, 0.2, 0.4, 0.6, 0.8, 1], fontsize=18)
-        ax.set_yticks(np.linspace(0, len(c) - 1, 6),
+        ax.set_yticks(np.linspace(0, len(matrix) - 1, 6),
                       [f'{label:.0f}' if label == 0 else f'{label:.2f}' for
                        label in np.linspace(r[4]*2, 0, 6)], fontsize=18)
         plt.tight_layout()
-        plt.show()
 
-model = p.PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
-r = model.variables()
-c, h = ic.Combination.funeral_worker(*r, h=0.6, model=model)
-plot_results(c)
+def compute():
+    """Function calculates the grid of figure 3A.
+    """
+    c, h = ic.Combination.funeral_worker(*r, h=0.6, model=model,
+                                         cache=DiskCache())
+    return {'p_c': c, 'p_h': h}
+
+def plot(data):
+    """Function plots figure 3A from the arrays returned by `compute`.
+    """
+    plot_results(data['p_c'])
+
+if __name__ == '__main__':
+    plot(compute())
+    plt.show()
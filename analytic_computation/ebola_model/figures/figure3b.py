@@ -3,6 +3,11 @@ import numpy as np
 
 from ebola_model.functions import probability as p
 
+PANELS = ('figure3b',)
+
+model = p.PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+r = model.variables()
+
 def plot_pmo_param(p_values, parameter, color, linestyle, label):
     """Plot the probabilty of a major outbreak against the uptake of safe
     burial practices
@@ -22,18 +27,29 @@ def plot_pmo_param(p_values, parameter, color, linestyle, label):
     ax.spines['right'].set_visible(False)
     plt.tight_layout()
 
-model = p.PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
-r = model.variables()
+def compute():
+    """Function calculates the curves of figure 3B for barrier nursing of
+    50%, 70% and 90% effectiveness.
+    """
+    data = {}
+    for alpha, label in [(0.5, '50'), (0.3, '70'), (0.1, '90')]:
+        data['p_c_' + label], data['p_h_' + label] = \
+            model.pmo_burial_compliance(alpha, r)
+    return data
+
+def plot(data):
+    """Function plots figure 3B from the arrays returned by `compute`.
+    """
+    # Plot with increased effectiveness of barrier nursing
+    plt.figure(figsize=[8, 6])
+    for label, color in [('50', 'green'), ('70', 'red'), ('90', 'blue')]:
+        plot_pmo_param((data['p_c_' + label], data['p_h_' + label]),
+                       np.linspace(0, 0.4/0.7, 1000), color=color,
+                       linestyle='-', label=label + '%')
+
+    plt.legend(title='Effectiveness of' + '\n' + 'barrier nursing',
+               fontsize=18, title_fontsize=18)
 
-# Plot with increased effectiveness of barrier nursing
-plt.figure(figsize=[8, 6])
-plot_pmo_param(model.pmo_burial_compliance(0.5, r),
-               np.linspace(0, 0.4/0.7, 1000), color='green', linestyle='-', label='50%')
-plot_pmo_param(model.pmo_burial_compliance(0.3, r),
-               np.linspace(0, 0.4/0.7, 1000), color='red', linestyle='-', label='70%')
-plot_pmo_param(model.pmo_burial_compliance(0.1, r),
-               np.linspace(0, 0.4/0.7, 1000), color='blue', linestyle='-', label='90%')
-
-plt.legend(title='Effectiveness of' + '\n' + 'barrier nursing',
-           fontsize=18, title_fontsize=18)
-plt.show()
\ No newline at end of file
+if __name__ == '__main__':
+    plot(compute())
+    plt.show()
@@ -1,4 +1,22 @@
-from ebola_model.functions.sobol import finding_indices
+import matplotlib.pyplot as plt
 
-# Function produces figures S2A and S2B
-finding_indices()
\ No newline at end of file
+from ebola_model.functions.sobol import plot_indices, sobol_indices
+
+PANELS = ('figureS2A', 'figureS2B')
+
+def compute():
+    """Function calculates the Sobol' indices of figures S2A and S2B.
+    """
+    problem, Si = sobol_indices()
+    return {'names': problem['names'], 'S1': Si['S1'], 'ST': Si['ST'],
+            'S1_conf': Si['S1_conf'], 'ST_conf': Si['ST_conf']}
+
+def plot(data):
+    """Function plots figures S2A and S2B from the arrays returned by
+    `compute`.
+    """
+    plot_indices(list(data['names']), data['S1'], data['ST'])
+
+if __name__ == '__main__':
+    plot(compute())
+    plt.show()
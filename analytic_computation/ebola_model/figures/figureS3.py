@@ -1,4 +1,28 @@
-from ebola_model.functions.sobol import varying_h
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 
-# Function produces figures S3A and S3B
-varying_h()
\ No newline at end of file
+from ebola_model.functions.sobol import h_indices, plot_h_indices
+
+PANELS = ('figureS3A', 'figureS3B')
+
+def compute():
+    """Function calculates the Sobol' indices of figures S3A and S3B for
+    each probability of treatment in a healthcare facility.
+    """
+    h = np.linspace(0, 1, 22)
+    df, st = h_indices(h=h)
+    return {'h': h, 'names': list(df.columns), 'S1': df.to_numpy(),
+            'ST': st.to_numpy()}
+
+def plot(data):
+    """Function plots figures S3A and S3B from the arrays returned by
+    `compute`.
+    """
+    names = list(data['names'])
+    plot_h_indices(data['h'], pd.DataFrame(data['S1'], columns=names),
+                   pd.DataFrame(data['ST'], columns=names))
+
+if __name__ == '__main__':
+    plot(compute())
+    plt.show()
@@ -2,8 +2,14 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from ebola_model.functions import probability as p
+from ebola_model.functions.cache import DiskCache
 from ebola_model.functions import intervention_combinations as ic
 
+PANELS = ('figureS4A', 'figureS4B')
+
+model = p.PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+r = model.variables()
+
 def plot_results_c(matrix):
         matrix = np.flip(matrix, axis=0)
 
@@ -25,16 +31,15 @@ def plot_results_c(matrix):
                    fontsize=20, multialignment='center', labelpad=10)
 
         ax = plt.gca()
-        ax.set_xticks(np.linspace(0, len(c) - 1, 6),
+        ax.set_xticks(np.linspace(0, len(matrix) - 1, 6),
                       [f'{label:.0f}' if label == 0 else f'{label:.1f}' for
                        label in np.linspace(0, 1, 6)], fontsize=18)
         xtick_labels = [0, 0.2, 0.4, 0.6, 0.8, 1]
         ax.set_xticklabels(xtick_labels, fontsize=18)
-        ax.set_yticks(np.linspace(0, len(c) - 1, 6),
+        ax.set_yticks(np.linspace(0, len(matrix) - 1, 6),
                       [f'{label:.0f}' if label == 0 else f'{label:.2f}' for
                        label in np.linspace(r[0]*2, 0, 6)], fontsize=18)
         plt.tight_layout()
-        plt.show()
 
 def plot_results_h(matrix):
         matrix = np.flip(matrix, axis=0)
@@ -58,17 +63,28 @@ def plot_results_h(matrix):
                    fontsize=20, multialignment='center', labelpad=10)
 
         ax = plt.gca()
-        ax.set_xticks(np.linspace(0, len(c) - 1, 6))
+        ax.set_xticks(np.linspace(0, len(matrix) - 1, 6))
         xtick_labels = [0, 0.2, 0.4, 0.6, 0.8, 1]
         ax.set_xticklabels(xtick_labels, fontsize=18)
-        ax.set_yticks(np.linspace(0, len(c) - 1, 6),
+        ax.set_yticks(np.linspace(0, len(matrix) - 1, 6),
                       [f'{label:.0f}' if label == 0 else f'{label:.2f}' for
                        label in np.linspace(r[0]*2, 0, 6)], fontsize=18)
         plt.tight_layout()
-        plt.show()
 
-model = p.PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
-r = model.variables()
-c, h = ic.Combination.hospitalisation_community(*r, model=model)
-plot_results_c(c)
-plot_results_h(h)
+def compute():
+    """Function calculates the grids of figures S4A and S4B.
+    """
+    c, h = ic.Combination.hospitalisation_community(*r, model=model,
+                                                    cache=DiskCache())
+    return {'p_c': c, 'p_h': h}
+
+def plot(data):
+    """Function plots figures S4A and S4B from the arrays returned by
+    `compute`.
+    """
+    plot_results_c(data['p_c'])
+    plot_results_h(data['p_h'])
+
+if __name__ == '__main__':
+    plot(compute())
+    plt.show()
@@ -0,0 +1,229 @@
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import os
+import tempfile
+import numpy as np
+
+from ebola_model.version_info import VERSION
+
+# Modules whose code determines the numbers stored in a DiskCache
+SOURCES = ('probability.py', 'kernels.py', 'intervention_combinations.py',
+           'local_sensitivity_analysis.py')
+
+
+class LRUCache:
+    """Class stores the results of recent solves keyed on their inputs,
+    evicting the least recently used entry once maxsize entries are held.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries held
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Method looks up an entry and marks it as recently used.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable key of the entry
+
+        Returns
+        -------
+        object
+            Cached value, or None if the key is not held
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Method stores an entry, evicting the least recently used entry if
+        the cache is full.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable key of the entry
+        value : object
+            Value to store
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Method removes all entries and resets the counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Method returns the counters of the cache.
+
+        Returns
+        -------
+        dict
+            Numbers of hits and misses, the maximum size and the current size
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'maxsize': self.maxsize, 'currsize': len(self._entries)}
+
+
+class DiskCache:
+    """Class stores arrays computed by the model on disk as .npz files named
+    by a hash of everything they depend on, so that unchanged inputs are
+    loaded instead of recomputed and any changed input misses.
+
+    Parameters
+    ----------
+    directory : str
+        Directory holding the cached files, defaulting to the
+        EBOLA_MODEL_CACHE environment variable or ~/.cache/ebola_model
+    """
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.environ.get(
+                'EBOLA_MODEL_CACHE',
+                os.path.join(os.path.expanduser('~'), '.cache', 'ebola_model'))
+        self.directory = directory
+
+    def key(self, name, inputs):
+        """Method calculates the key of a computation from its name, its
+        inputs, the version of the package and the source of the modules in
+        SOURCES, so that entries computed by other solver code miss.
+
+        Parameters
+        ----------
+        name : str
+            Name of the computation
+        inputs : dict
+            Model parameters, grid axes and solver settings of the
+            computation
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        _update(digest, (name, VERSION, source_digest(), inputs))
+        return digest.hexdigest()
+
+    def cached(self, name, inputs, compute):
+        """Method loads the arrays of a computation from disk, or computes
+        and stores them if they are not held.
+
+        Parameters
+        ----------
+        name : str
+            Name of the computation
+        inputs : dict
+            Model parameters, grid axes and solver settings of the
+            computation
+        compute : callable
+            Function without arguments returning a tuple of arrays
+
+        Returns
+        -------
+        tuple
+            Arrays returned by compute
+        """
+        path = os.path.join(self.directory, self.key(name, inputs) + '.npz')
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return tuple(data['arr_{}'.format(i)]
+                             for i in range(len(data.files)))
+        result = tuple(compute())
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a
+        # partly written entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(file, *result)
+        os.replace(tmp, path)
+        return result
+
+
+def cached(cache, name, inputs, compute):
+    """Function runs a computation through a DiskCache, or directly when
+    the cache is None.
+
+    Parameters
+    ----------
+    cache : DiskCache
+        Cache to use, or None
+    name : str
+        Name of the computation
+    inputs : dict
+        Model parameters, grid axes and solver settings of the computation
+    compute : callable
+        Function without arguments returning a tuple of arrays
+
+    Returns
+    -------
+    tuple
+        Arrays returned by compute
+    """
+    if cache is None:
+        return tuple(compute())
+    return cache.cached(name, inputs, compute)
+
+
+@lru_cache(maxsize=None)
+def source_digest():
+    """Function hashes the source of the modules in SOURCES.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in SOURCES:
+        digest.update(name.encode() + b'\0')
+        with open(os.path.join(directory, name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _update(digest, value):
+    """Function feeds a nested structure of dicts, sequences, strings,
+    numbers and arrays into a hash, tagging each item with its type.
+    """
+    if isinstance(value, dict):
+        digest.update(b'dict')
+        for k in sorted(value):
+            _update(digest, k)
+            _update(digest, value[k])
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'seq' + str(len(value)).encode())
+        for v in value:
+            _update(digest, v)
+    elif isinstance(value, str):
+        digest.update(b'str' + value.encode() + b'\0')
+    elif value is None:
+        digest.update(b'none')
+    else:
+        value = np.ascontiguousarray(value)
+        digest.update(b'array' + value.dtype.str.encode() +
+                      str(value.shape).encode())
+        digest.update(value.tobytes())
@@ -1,49 +1,159 @@
-from scipy.optimize import root
+from itertools import repeat
+import os
 import numpy as np
 
-from ebola_model.functions.probability import PMO
+from ebola_model.functions import probability
+from ebola_model.functions.probability import (Telemetry, counted, pmo_batch,
+                                                tangent)
 
-model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+OUTPUTS = ('p_c', 'p_h', 'q_c', 'q_f', 'q_h')
+WARM_METHODS = ('anderson', 'lm')
 
-class Model:
-    def __init__(self):
-        self.q_c_values = []
-        self.q_h_values = []
-        self.p_c_values = []
-        self.p_h_values = []
 
-    def find_p_q(self, solution):
-        """Method calculates a list of probabilities of a major outbreak given
-        the probability that an outbreak does not occur.
+def _variables(X, h, r_f):
+    """Function converts the rows of X into the variables (r_c, p_b, r_f,
+    r_v, r_w, h) of the model, taking h from the fifth column when it is
+    None.
+    """
+    if h is None:
+        h = X[:, 4]
+    return X[:, 0], 0.7*X[:, 1], r_f, X[:, 2], X[:, 3], h
 
-        Parameters
-        ----------
-        solution : array
-            Probabilities that an outbreak occurs and is treated
-            initially in the community and in a healthcare facility
 
-        Returns
-        -------
-        tuple[list, list]
-            List of probabilities that an outbreak occurs and is treated
-            initially in the community and in a healthcare facility
-        """
-        self.q_c_values.append(solution[0])
-        self.q_h_values.append(solution[2])
-        if 1 - solution[0] < 0:
-            self.p_c_values.append(0.0)
-        else:
-            self.p_c_values.append(1.0 - solution[0])
-        if 1 - solution[2] < 0:
-            self.p_h_values.append(0.0)
-        else:
-            self.p_h_values.append(1.0 - solution[2])
-        return self.p_c_values, self.p_h_values
+def _solution(X, h, r_f, method, start=None):
+    """Function solves the model for the rows of X, taking h from the fifth
+    column when it is None.
+    """
+    return pmo_batch(*_variables(X, h, r_f), method=method, start=start)
+
+
+def _outputs(q, outputs):
+    """Function selects the outputs named in outputs, from OUTPUTS, of the
+    probabilities q = (q_c, q_f, q_h) that no major outbreak occurs, giving
+    an array with one row for each output.
+    """
+    Y = np.empty((len(outputs),) + np.shape(q)[1:])
+    for k, name in enumerate(outputs):
+        Y[k] = q['cfh'.index(name[-1])]
+        if name[0] == 'p':
+            Y[k] = 1.0 - Y[k]
+    return Y
+
+
+def _solve_rows(X, h, r_f, method, outputs=('p_c',)):
+    """Function calculates the outputs of the model for the rows of X,
+    taking h from the fifth column when it is None.
+    """
+    solution = _solution(X, h, r_f, method)
+    return _outputs(np.array([solution.q_c, solution.q_f, solution.q_h]),
+                    outputs)
+
 
+def _solve_saltelli(X, h, r_f, method, outputs=('p_c',)):
+    """Function calculates the outputs of the model for the rows of a
+    Saltelli design without second-order samples, which is made of blocks
+    [A, AB^1, ..., AB^D, B] of D + 2 rows for the D columns of X. A and B
+    rows are solved from scratch. Each AB^i row differs from its A row in
+    column i only, so it is copied from the A or B row if it equals either.
+    For the methods of WARM_METHODS the other AB^i rows are corrected from
+    the tangent prediction made at the solution of their A row, unless it
+    is subcritical, which saves more than half the time of a cold solve
+    with 'lm' and about a seventh with 'anderson'. For the other methods the
+    tangent predictions cost as much as the iterations they save, so the
+    other AB^i rows are solved from scratch.
+    """
+    n_vars = X.shape[1]
+    blocks = X.reshape(-1, n_vars + 2, n_vars)
+    if h is not None:
+        h = np.reshape(np.broadcast_to(h, len(X)), blocks.shape[:2])
+    q = np.empty((3,) + blocks.shape[:2])
+    for k in (0, -1):
+        solution = _solution(blocks[:, k], None if h is None else h[:, k],
+                             r_f, method)
+        q[:, :, k] = solution.q_c, solution.q_f, solution.q_h
+    same_a = np.all(blocks[:, 1:-1] == blocks[:, :1], axis=2)
+    same_b = np.all(blocks[:, 1:-1] == blocks[:, -1:], axis=2)
+    q[:, :, 1:-1] = np.where(same_a, q[:, :, :1], q[:, :, -1:])
+    block, i = np.nonzero(~same_a & ~same_b)
+    i = i + 1
+    h_ab = None if h is None else h[block, i]
+    h_a = None if h is None else h[block, 0]
+    theta = np.array(np.broadcast_arrays(*_variables(blocks[block, i], h_ab,
+                                                     r_f)))
+    if method not in WARM_METHODS:
+        solution = pmo_batch(*theta, method=method)
+        q[:, block, i] = solution.q_c, solution.q_f, solution.q_h
+        return _outputs(q.reshape(3, -1), outputs)
+    q_a = q[:, block, 0]
+    warm = ~np.all(q_a == 1, axis=0)
+    theta_a = np.array(np.broadcast_arrays(*_variables(blocks[block, 0], h_a,
+                                                       r_f)))
+    step = tangent(q_a, *theta_a, direction=theta - theta_a)
+    start = np.clip(q_a + np.where(np.isfinite(step), step, 0), 0, 1)
+    for rows, guess in ((warm, start[:, warm]), (~warm, None)):
+        solution = pmo_batch(*theta[:, rows], method=method, start=guess)
+        q[:, block[rows], i[rows]] = (solution.q_c, solution.q_f,
+                                      solution.q_h)
+    return _outputs(q.reshape(3, -1), outputs)
+
+
+def _map_rows(X, h, r_f, method, n_workers, solve=_solve_rows, block=1,
+              outputs=('p_c',)):
+    """Function solves the rows of X in chunks of whole blocks of rows on a
+    pool of n_workers processes and reassembles the results in order,
+    together with the solver counts of every chunk. The rows of a chunk are
+    solved without reference to the other chunks, so the results do not
+    depend on the chunking. A ValueError is raised if the rows of X are not
+    whole blocks, before any are solved.
+    """
+    if len(X) % block:
+        raise ValueError('The number of rows of a Saltelli design must be a '
+                         'multiple of {}'.format(block))
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    if n_workers == 1:
+        return counted(solve, X, h, r_f, method, outputs)
+    from concurrent.futures import ProcessPoolExecutor
+
+    blocks = np.array_split(np.arange(len(X) // block), 4*n_workers)
+    rows = [slice(b[0]*block, (b[-1] + 1)*block) for b in blocks if len(b)]
+    chunks = [X[row] for row in rows]
+    h_chunks = [h[row] for row in rows] if np.ndim(h) else repeat(h)
+    with ProcessPoolExecutor(n_workers) as executor:
+        results = list(executor.map(counted, repeat(solve), chunks, h_chunks,
+                                    repeat(r_f), repeat(method),
+                                    repeat(outputs)))
+    counts = Telemetry()
+    for _, chunk_counts in results:
+        counts.merge(chunk_counts)
+    return np.concatenate([Y for Y, _ in results], axis=1), counts
+
+
+def _record(counts, telemetry):
+    """Function adds the solver counts of an evaluation to the module
+    telemetry of `probability`, and to telemetry unless it is None.
+    """
+    probability.telemetry.merge(counts)
+    if telemetry is not None:
+        telemetry.merge(counts)
+
+
+def _check_outputs(outputs):
+    """Function raises a ValueError if outputs names anything outside
+    OUTPUTS.
+    """
+    unknown = [name for name in outputs if name not in OUTPUTS]
+    if unknown:
+        raise ValueError('Unknown outputs {}, expected names from {}'.format(
+            unknown, OUTPUTS))
+
+
+class Model:
     @staticmethod
-    def evaluate(X, r_f=5.9):
+    def evaluate(X, r_f=5.9, method='auto', n_workers=1, saltelli=False,
+                 outputs=None, telemetry=None):
         """Method that determines the probability of a major outbreak for
-        certain parameter values X and stores the results in a matrix.
+        certain parameter values X and returns the results in an array.
         
         Parameters
         ----------
@@ -51,70 +161,113 @@ class Model:
             Array of the model variables
         r_f : float
             Average expected number of infections from an unsafe burial
+        method : str
+            Solver used by `pmo_batch`
+        n_workers : int
+            Number of processes the rows of X are split across, or None to
+            use every core
+        saltelli : bool
+            Whether X is a Saltelli design from `SALib.sample.sobol.sample`
+            without second-order samples, whose rows are then deduplicated,
+            and warm-started from the rows they differ from in one column
+            for the methods of WARM_METHODS
+        outputs : tuple[str]
+            Outputs from OUTPUTS returned from the same solves, or None for
+            the probability of a major outbreak starting in the community
+            only
+        telemetry : Telemetry
+            Instance the solver counts of this evaluation are added to,
+            including those of worker processes, as well as to the module
+            telemetry of `probability`
             
         Returns
         -------
         np.array
             Probabilities that an outbreak occurs and is treated
-            initially in the community
+            initially in the community, or an array with one row for each
+            of outputs
         """
-        Y = np.zeros(X.shape[0])
-        for i in range(X.shape[0]):
-            def equations(vars):
-                x, y, z = vars
-                eq1 = (X[i, 0] * (1 - X[i, 4])) / (X[i, 0] + 1) * x**2 +\
-                      (X[i, 0] * X[i, 4]) / (X[i, 0] + 1) * x * z +\
-                      0.7*X[i, 1] / (X[i, 0] + 1) * y +\
-                      (1 - 0.7*X[i, 1]) / (X[i, 0] + 1) - x
-                eq2 = (r_f * (1 - X[i, 4])) / (r_f + 1) * x * y +\
-                      (r_f * X[i, 4]) / (r_f + 1) * y * z + 1 / (r_f + 1) - y
-                eq3 = (X[i, 2] * (1 - X[i, 4])) / (X[i, 2] + X[i, 3] + 1) *x*z\
-                      + (X[i, 4] * X[i, 2] + X[i, 3]) /\
-                        (X[i, 2] + X[i, 3] + 1) * z**2 +\
-                      1 / (X[i, 2] + X[i, 3] + 1) - z
-                return [eq1, eq2, eq3]
-
-            solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-            p_c_values, p_h_values = model.find_p_q(solution=solution.x)
-            Y[i] = p_c_values[i]
-        return Y
+        if outputs is not None:
+            _check_outputs(outputs)
+        if saltelli:
+            Y, counts = _map_rows(X, None, r_f, method, n_workers,
+                                  _solve_saltelli, X.shape[1] + 2,
+                                  outputs or ('p_c',))
+        else:
+            Y, counts = _map_rows(X, None, r_f, method, n_workers,
+                                  outputs=outputs or ('p_c',))
+        _record(counts, telemetry)
+        return Y[0] if outputs is None else Y
     
-    def evaluate_h(self, h, X, r_f=5.9):
+    def evaluate_h(self, h, X, r_f=5.9, method='auto', n_workers=1,
+                   saltelli=False, chunk_size=1048576, outputs=None,
+                   telemetry=None):
         """Method that determines the probability of a major outbreak for
-        certain parameter values X and different h values, and stores the 
-        results in a matrix.
+        certain parameter values X and different h values, and returns the
+        results in an array. For an array of h values the rows of X are
+        solved for every value together, in batches of about chunk_size
+        points.
         
         Parameters
         ----------
-        h : float
-            Probability of hospitalisation
+        h : float or np.array
+            Probability of hospitalisation, or a one-dimensional array of
+            them
         X : np.array
             Array of the model variables
         r_f : float
             Average expected number of infections from an unsafe burial
+        method : str
+            Solver used by `pmo_batch`
+        n_workers : int
+            Number of processes the rows of X are split across, or None to
+            use every core
+        saltelli : bool
+            Whether X is a Saltelli design from `SALib.sample.sobol.sample`
+            without second-order samples, whose rows are then deduplicated,
+            and warm-started from the rows they differ from in one column
+            for the methods of WARM_METHODS
+        chunk_size : int
+            Number of points solved together for an array of h values
+        outputs : tuple[str]
+            Outputs from OUTPUTS returned from the same solves, or None for
+            the probability of a major outbreak starting in the community
+            only
+        telemetry : Telemetry
+            Instance the solver counts of this evaluation are added to,
+            including those of worker processes, as well as to the module
+            telemetry of `probability`
         
         Returns
         -------
         np.array
             Probabilities that an outbreak occurs and is treated
-            initially in a healthcare facility
+            initially in the community, with shape (len(h), len(X)) for an
+            array of h values, and with a leading axis over outputs if they
+            are given
         """
-        Y = np.zeros(X.shape[0])
-        for i in range(X.shape[0]):
-            def equations(vars):
-                x, y, z = vars
-                eq1 = (X[i, 0] * (1 - h)) / (X[i, 0] + 1) * x**2 +\
-                      (X[i, 0] * h) / (X[i, 0] + 1) * x * z +\
-                      0.7*X[i, 1] / (X[i, 0] + 1) * y +\
-                      (1 - 0.7*X[i, 1]) / (X[i, 0] + 1) - x
-                eq2 = (r_f * (1 - h)) / (r_f + 1) * x * y +\
-                      (r_f * h) / (r_f + 1) * y * z + 1 / (r_f + 1) - y
-                eq3 = (X[i, 2] * (1 - h)) / (X[i, 2] + X[i, 3] + 1) * x * z +\
-                      (h * X[i, 2] + X[i, 3]) / (X[i, 2] + X[i, 3] + 1) * z**2\
-                      + 1 / (X[i, 2] + X[i, 3] + 1) - z
-                return [eq1, eq2, eq3]
-
-            solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-            self.find_p_q(solution=solution.x)
-            Y[i] = self.p_c_values[i]  # Use index i instead of 0
-        return Y
+        if outputs is not None:
+            _check_outputs(outputs)
+        names = outputs or ('p_c',)
+        if saltelli:
+            solve, block = _solve_saltelli, X.shape[1] + 2
+        else:
+            solve, block = _solve_rows, 1
+        if np.ndim(h) == 0:
+            Y, counts = _map_rows(X, h, r_f, method, n_workers, solve, block,
+                                  names)
+        else:
+            h = np.asarray(h, dtype=float)
+            Y = np.empty((len(names), len(h), len(X)))
+            counts = Telemetry()
+            step = max(1, chunk_size // len(X))
+            for start in range(0, len(h), step):
+                h_chunk = h[start:start + step]
+                Y_chunk, chunk_counts = _map_rows(
+                    np.tile(X, (len(h_chunk), 1)), np.repeat(h_chunk, len(X)),
+                    r_f, method, n_workers, solve, block, names)
+                Y[:, start:start + len(h_chunk)] = Y_chunk.reshape(
+                    len(names), -1, len(X))
+                counts.merge(chunk_counts)
+        _record(counts, telemetry)
+        return Y[0] if outputs is None else Y
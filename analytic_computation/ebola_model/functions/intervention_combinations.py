@@ -1,9 +1,452 @@
+from itertools import repeat
+import os
 import numpy as np
-from scipy.optimize import root
+
+from ebola_model.functions import probability
+from ebola_model.functions.cache import cached
+from ebola_model.functions.probability import (Telemetry, counted, pmo_batch,
+                                                pmo_sensitivity,
+                                                reproduction_number)
+
+VARIABLES = ('r_c', 'p_b', 'r_f', 'r_v', 'r_w', 'h')
+
+
+def _axes(model, axes):
+    """Function checks the axes of a grid and converts an axis of the
+    probability of unsafe burial given death p_f into one of p_b.
+    """
+    names, values = [], []
+    for name, axis in axes.items():
+        axis = np.asarray(axis, dtype=float)
+        if name == 'p_f':
+            name, axis = 'p_b', model.d*axis
+        if name not in VARIABLES:
+            raise ValueError("Unknown variable '{}'".format(name))
+        if name in names:
+            raise ValueError("Variable '{}' is given twice".format(name))
+        names.append(name)
+        values.append(axis)
+    if not names:
+        raise ValueError('At least one axis is required')
+    return names, values
+
+
+def _solve(base, names, points, method, gradients=False):
+    """Function solves the model at points given by the values of the
+    named variables, holding the others at their base values, returning
+    the derivatives from `pmo_sensitivity` as well if gradients is True.
+    """
+    variables = dict(base)
+    variables.update(zip(names, points))
+    if gradients:
+        return pmo_sensitivity(*[variables[v] for v in VARIABLES],
+                               method=method)
+    return pmo_batch(*[variables[v] for v in VARIABLES], method=method)
+
+
+def _block(base, names, values, method, gradients, start, stop):
+    """Function solves the points start to stop of the grid spanned by
+    values, in row-major order, returning p_c and p_h and, if gradients is
+    True, their derivatives.
+    """
+    shape = tuple(len(axis) for axis in values)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    points = [values[k][index[k]] for k in range(len(names))]
+    if gradients:
+        solution, d_c, d_h = _solve(base, names, points, method,
+                                    gradients=True)
+        return solution.p_c, solution.p_h, d_c, d_h
+    solution = _solve(base, names, points, method)
+    return solution.p_c, solution.p_h
+
+
+def _shared_block(buffers, dtype, base, names, values, method, gradients,
+                  start, stop):
+    """Function solves a block of the grid in a worker process and writes
+    it straight into the shared memory output buffers named in buffers, so
+    that only the solver counts of the block are sent back to the parent
+    process.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    size = int(np.prod([len(axis) for axis in values]))
+    results, counts = counted(_block, base, names, values, method, gradients,
+                              start, stop)
+    for name, result in zip(buffers, results):
+        memory = SharedMemory(name=name)
+        rows = result.reshape(-1, stop - start)
+        out = np.ndarray((len(rows), size), dtype=dtype, buffer=memory.buf)
+        out[:, start:stop] = rows
+        del out
+        memory.close()
+    return counts
+
 
 class Combination:
-     
-    def funeral_worker(r_c, p_b, r_f, r_v, r_w, h, model):
+
+    @staticmethod
+    def sweep(model, axes, r=None, h=0.6, method='auto', dtype=np.float64,
+              chunk_size=65536, cache=None, gradients=False, n_workers=1,
+              telemetry=None):
+        """Method calculates the probability of a major outbreak over the
+        grid spanned by any subset of the variables of the model.
+
+        Parameters
+        ----------
+        model : class
+            Instance of the class for the model
+        axes : dict
+            Arrays of values keyed on the names of the variables that vary,
+            from 'r_c', 'p_f', 'p_b', 'r_f', 'r_v', 'r_w' and 'h', in the
+            order of the axes of the grid. The probability of unsafe burial
+            given death p_f is converted to p_b with the probability of death
+            of the model
+        r : tuple
+            Values of (r_c, p_b, r_f, r_v, r_w) held fixed, defaulting to
+            `model.variables()`
+        h : float
+            Probability of hospitalisation held fixed
+        method : str
+            Solver used by `pmo_batch`
+        dtype : np.dtype
+            Data type of the returned arrays
+        chunk_size : int
+            Number of grid points solved in each batch
+        cache : DiskCache
+            Cache the grid is loaded from or stored in, or None to always
+            compute it
+        gradients : bool
+            Whether to also return the derivatives of the probabilities with
+            respect to the variables at every point of the grid, which
+            `pmo_sensitivity` finds from the converged solutions without
+            further nonlinear solves
+        n_workers : int
+            Number of processes the grid is solved on, or None for one per
+            CPU. Workers solve blocks of at most chunk_size points as they
+            become free and write them straight into shared memory. The
+            finished grid is copied out once into ordinary arrays, so the
+            shared segments are unlinked before returning and never leak,
+            for the price of one extra pass over the outputs
+        telemetry : Telemetry
+            Instance the solver counts of this sweep are added to, including
+            those of worker processes, as well as to the module telemetry of
+            `probability`. Nothing is counted when the grid is loaded from
+            cache
+
+        Returns
+        -------
+        tuple[np.array, ...]
+            Probabilities that an outbreak occurs and is treated
+            initially in the community and in a healthcare facility, with
+            one axis per entry of axes, followed if gradients is True by
+            their derivatives with respect to (r_c, p_b, r_f, r_v, r_w, h)
+            along a leading axis of length 6
+        """
+        if r is None:
+            r = model.variables()
+        base = dict(zip(VARIABLES, tuple(r) + (h,)))
+        names, values = _axes(model, axes)
+        shape = tuple(len(axis) for axis in values)
+        size = int(np.prod(shape))
+        widths = (1, 1, 6, 6) if gradients else (1, 1)
+        counts = Telemetry()
+
+        def compute():
+            outputs = [np.empty((width,) + shape, dtype=dtype)
+                       for width in widths]
+            for start in range(0, size, chunk_size):
+                stop = min(start + chunk_size, size)
+                results, block_counts = counted(_block, base, names, values,
+                                                method, gradients, start, stop)
+                counts.merge(block_counts)
+                for out, result in zip(outputs, results):
+                    out.reshape(len(out), -1)[:, start:stop] = \
+                        result.reshape(len(out), -1)
+            return tuple(out[0] if len(out) == 1 else out for out in outputs)
+
+        def compute_shared():
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing.shared_memory import SharedMemory
+
+            # Blocks of at most chunk_size points of the flattened grid,
+            # several per worker, which the pool hands out as workers become
+            # free
+            block = max(1, min(chunk_size, -(-size // (8*n_workers))))
+            starts = range(0, size, block)
+            stops = [min(start + block, size) for start in starts]
+            itemsize = np.dtype(dtype).itemsize
+            memories = [SharedMemory(create=True,
+                                     size=max(1, width*size*itemsize))
+                        for width in widths]
+            try:
+                with ProcessPoolExecutor(n_workers) as executor:
+                    block_counts = list(executor.map(
+                        _shared_block,
+                        repeat([memory.name for memory in memories]),
+                        repeat(dtype), repeat(base), repeat(names),
+                        repeat(values), repeat(method), repeat(gradients),
+                        starts, stops))
+                for counts_k in block_counts:
+                    counts.merge(counts_k)
+                # Copied so the segments can be unlinked below
+                outputs = [np.ndarray((width,) + shape, dtype=dtype,
+                                      buffer=memory.buf).copy()
+                           for width, memory in zip(widths, memories)]
+            finally:
+                for memory in memories:
+                    memory.close()
+                    memory.unlink()
+            return tuple(out[0] if len(out) == 1 else out for out in outputs)
+
+        if n_workers is None:
+            n_workers = os.cpu_count()
+        if n_workers > 1:
+            compute = compute_shared
+        inputs = {'base': base, 'names': names, 'axes': values,
+                  'method': method, 'dtype': np.dtype(dtype).str}
+        if gradients:
+            inputs['gradients'] = True
+        result = cached(cache, 'sweep', inputs, compute)
+        probability.telemetry.merge(counts)
+        if telemetry is not None:
+            telemetry.merge(counts)
+        return result
+
+    @staticmethod
+    def adaptive(model, axes, r=None, h=0.6, method='auto', n_coarse=17,
+                 depth=4, tol=0.02, levels=None):
+        """Method calculates the probability of a major outbreak over a
+        two-dimensional grid by adaptive refinement. A coarse grid is solved
+        first and each cell is split into four, recursively, while pi_C or
+        pi_H varies across its corners by more than tol or crosses one of the
+        contour levels. Cells that are not split are filled by bilinear
+        interpolation of their corners.
+
+        Parameters
+        ----------
+        model : class
+            Instance of the class for the model
+        axes : dict
+            Bounds (start, stop) keyed on the names of the two variables that
+            vary, as in `sweep`
+        r : tuple
+            Values of (r_c, p_b, r_f, r_v, r_w) held fixed, defaulting to
+            `model.variables()`
+        h : float
+            Probability of hospitalisation held fixed
+        method : str
+            Solver used by `pmo_batch`
+        n_coarse : int
+            Number of points along each axis of the coarse grid
+        depth : int
+            Maximum number of times a cell is split
+        tol : float
+            Largest change in pi across a cell that is left unrefined
+        levels : list
+            Contour levels whose crossings are always refined
+
+        Returns
+        -------
+        tuple[np.array, np.array, list, np.array]
+            Probabilities that an outbreak occurs and is treated initially
+            in the community and in a healthcare facility on the regular grid
+            of (n_coarse - 1)*2**depth + 1 points along each axis, the values
+            of the two axes of that grid, and the samples that were solved as
+            rows of (first variable, second variable, pi_C, pi_H)
+        """
+        if len(axes) != 2:
+            raise ValueError('Exactly two axes are required')
+        if r is None:
+            r = model.variables()
+        base = dict(zip(VARIABLES, tuple(r) + (h,)))
+        n = (n_coarse - 1)*2**depth + 1
+        grid_axes = [np.linspace(start, stop, n)
+                     for start, stop in axes.values()]
+        names, values = _axes(model, dict(zip(axes, grid_axes)))
+        levels = np.asarray([] if levels is None else levels, dtype=float)
+        p = np.zeros((2, n, n))
+        computed = np.zeros((n, n), dtype=bool)
+
+        def evaluate(i, j):
+            flat = np.unique(np.ravel_multi_index((i, j), (n, n)))
+            i, j = np.unravel_index(flat[~computed.reshape(-1)[flat]], (n, n))
+            solution = _solve(base, names, [values[0][i], values[1][j]],
+                              method)
+            p[0, i, j], p[1, i, j] = solution.p_c, solution.p_h
+            computed[i, j] = True
+
+        stride = 2**depth
+        i, j = np.meshgrid(np.arange(0, n, stride), np.arange(0, n, stride),
+                           indexing='ij')
+        evaluate(i.ravel(), j.ravel())
+        ci, cj = i[:-1, :-1].ravel(), j[:-1, :-1].ravel()
+        unrefined = []
+        while stride > 1:
+            corners = np.stack([p[:, ci, cj], p[:, ci + stride, cj],
+                                p[:, ci, cj + stride],
+                                p[:, ci + stride, cj + stride]])
+            low, high = corners.min(axis=0), corners.max(axis=0)
+            refine = np.any(high - low > tol, axis=0)
+            if levels.size:
+                refine |= np.any((low[..., None] < levels) &
+                                 (levels <= high[..., None]), axis=(0, 2))
+            unrefined.append((ci[~refine], cj[~refine], stride))
+            ci, cj, half = ci[refine], cj[refine], stride//2
+            evaluate(np.concatenate([ci + half, ci, ci + half, ci + stride,
+                                     ci + half]),
+                     np.concatenate([cj, cj + half, cj + stride, cj + half,
+                                     cj + half]))
+            ci = np.concatenate([ci, ci + half, ci, ci + half])
+            cj = np.concatenate([cj, cj, cj + half, cj + half])
+            stride = half
+
+        samples = np.nonzero(computed)
+        samples = np.column_stack([grid_axes[0][samples[0]],
+                                   grid_axes[1][samples[1]],
+                                   p[0][samples], p[1][samples]])
+        for ci, cj, stride in unrefined:
+            offset = np.arange(stride + 1)
+            u = (offset/stride)[:, None]
+            v = (offset/stride)[None, :]
+            i, j = np.broadcast_arrays(ci[:, None, None] + offset[:, None],
+                                       cj[:, None, None] + offset[None, :])
+            fill = ((1 - u)*(1 - v)*p[:, ci, cj][..., None, None] +
+                    u*(1 - v)*p[:, ci + stride, cj][..., None, None] +
+                    (1 - u)*v*p[:, ci, cj + stride][..., None, None] +
+                    u*v*p[:, ci + stride, cj + stride][..., None, None])
+            mask = ~computed[i, j]
+            p[:, i[mask], j[mask]] = fill[:, mask]
+        return p[0], p[1], grid_axes, samples
+
+    @staticmethod
+    def contour(model, level, axes, r=None, h=0.6, output='p_c',
+                method='auto', n_trace=200, n_scan=16, tol=1e-9):
+        """Method traces the curves on which the probability of a major
+        outbreak equals a given level through a two-dimensional plane of the
+        variables. The plane is scanned on a coarse grid of n_scan points
+        along the first axis for each of the n_trace values of the second,
+        solved as one batch, and every crossing of the level found along the
+        first axis is refined by the Illinois method. The brackets of all
+        values of the second axis are refined together, so each Illinois
+        step is a single call to `pmo_batch`.
+
+        Parameters
+        ----------
+        model : class
+            Instance of the class for the model
+        level : float
+            Probability of a major outbreak traced
+        axes : dict
+            Bounds (start, stop) keyed on the names of the variable bracketed
+            along and the variable followed, as in `sweep`
+        r : tuple
+            Values of (r_c, p_b, r_f, r_v, r_w) held fixed, defaulting to
+            `model.variables()`
+        h : float
+            Probability of hospitalisation held fixed
+        output : str
+            Probability traced, 'p_c' for pi_C or 'p_h' for pi_H
+        method : str
+            Solver used by `pmo_batch`
+        n_trace : int
+            Number of values of the followed variable
+        n_scan : int
+            Number of points of a scan along the bracketed variable
+        tol : float
+            Width of the bracket at which a crossing has converged
+
+        Returns
+        -------
+        list
+            Polylines as arrays of rows (bracketed variable, followed
+            variable), with a new polyline whenever the number of crossings
+            changes
+        """
+        if len(axes) != 2:
+            raise ValueError('Exactly two axes are required')
+        if output not in ('p_c', 'p_h'):
+            raise ValueError("Unknown output '{}'".format(output))
+        if r is None:
+            r = model.variables()
+        base = dict(zip(VARIABLES, tuple(r) + (h,)))
+        (name_u, (u_0, u_1)), (name_v, (v_0, v_1)) = axes.items()
+        scan = np.linspace(u_0, u_1, n_scan)
+        trace = np.linspace(v_0, v_1, n_trace)
+
+        def excess(u, v):
+            names, values = _axes(model, {name_u: u, name_v: v})
+            solution = _solve(base, names, values, method)
+            return getattr(solution, output) - level
+
+        f = excess(scan[np.newaxis, :], trace[:, np.newaxis])
+        row, change = np.nonzero((f[:, :-1] > 0) != (f[:, 1:] > 0))
+        v = trace[row]
+        a, b = scan[change], scan[change + 1]
+        f_a, f_b = f[row, change], f[row, change + 1]
+        for _ in range(100):
+            active = np.abs(b - a) > tol
+            if not np.any(active):
+                break
+            with np.errstate(divide='ignore', invalid='ignore'):
+                c = b - f_b*(b - a)/(f_b - f_a)
+            c = np.where(np.isfinite(c), c, (a + b)/2)
+            f_c = excess(c[active], v[active])
+            c_active = c[active]
+            flip = (f_c > 0) != (f_b[active] > 0)
+            a[active] = np.where(flip, b[active], a[active])
+            f_a[active] = np.where(flip, f_b[active], f_a[active]/2)
+            b[active], f_b[active] = c_active, f_c
+            a[active] = np.where(f_c == 0, c_active, a[active])
+
+        polylines, branches = [], []
+        bounds = np.searchsorted(row, np.arange(n_trace + 1))
+        for k, v in enumerate(trace):
+            crossings = np.sort(b[bounds[k]:bounds[k + 1]])
+            if len(crossings) != len(branches):
+                polylines.extend(branches)
+                branches = [[] for _ in crossings]
+            for branch, u in zip(branches, crossings):
+                branch.append((u, v))
+        polylines.extend(branches)
+        return [np.array(branch) for branch in polylines if len(branch) > 1]
+
+    @staticmethod
+    def reproduction_number(model, axes, r=None, h=0.6):
+        """Method calculates the reproduction number of the model over the
+        grid spanned by any subset of the variables, whose level set at 1 is
+        the critical surface below which the probability of a major outbreak
+        is 0.
+
+        Parameters
+        ----------
+        model : class
+            Instance of the class for the model
+        axes : dict
+            Arrays of values keyed on the names of the variables that vary,
+            as in `sweep`
+        r : tuple
+            Values of (r_c, p_b, r_f, r_v, r_w) held fixed, defaulting to
+            `model.variables()`
+        h : float
+            Probability of hospitalisation held fixed
+
+        Returns
+        -------
+        np.array
+            Reproduction numbers, with one axis per entry of axes
+        """
+        if r is None:
+            r = model.variables()
+        variables = dict(zip(VARIABLES, tuple(r) + (h,)))
+        names, values = _axes(model, axes)
+        for k, (name, axis) in enumerate(zip(names, values)):
+            shape = [1]*len(names)
+            shape[k] = len(axis)
+            variables[name] = axis.reshape(shape)
+        return reproduction_number(*[variables[v] for v in VARIABLES])
+
+    def funeral_worker(r_c, p_b, r_f, r_v, r_w, h, model, method='auto',
+                       cache=None, n=300):
         """Method calculates the probability of a major outbreak for varying
         average expected number of infections of healthcare workers, and
         probability of unsafe burials given death.
@@ -24,7 +467,15 @@ class Combination:
         h : float
             Probability of hospitalisation
         model : class
-            Instance of the class for the model
+            Instance of the class for the model, whose probability of death
+            converts the probability of unsafe burial given death into p_b
+        method : str
+            Solver used by `pmo_batch`
+        cache : DiskCache
+            Cache the grid is loaded from or stored in, or None to always
+            compute it
+        n : int
+            Number of grid points along each axis
 
         Returns
         -------
@@ -32,37 +483,13 @@ class Combination:
             Probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility
         """
-        solution_c_matrix = np.zeros((300, 300))
-        solution_h_matrix = np.zeros((300, 300))
-        p_f_ = np.linspace(0, 1, 300)
-        r_w_ = np.linspace(0*r_w, 2*r_w, 300)
-
-        for i in range(len(r_w_)):
-            for j in range(len(p_f_)):
-                def equations(vars):
-                    x, y, z = vars
-                    eq1 = (r_c*(1 - h)) / (r_c + 1) *x**2 +\
-                          (r_c*h) / (r_c + 1) *x*z +\
-                          0.7*p_f_[j] / (r_c + 1) *y +\
-                          (1 - 0.7*p_f_[j]) / (r_c + 1) - x
-                    eq2 = (r_f*(1 - h)) / (r_f + 1) *x*y +\
-                          (r_f*h) / (r_f + 1) *y*z + 1 / (r_f + 1) - y
-                    eq3 = (r_v*(1 - h)) / (r_v + r_w_[i] + 1) *x*z +\
-                          (h*r_v + r_w_[i]) / (r_v + r_w_[i] + 1) * z**2 +\
-                          1 / (r_v + r_w_[i] + 1) - z
-                    return [eq1, eq2, eq3]
-
-                solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-                p_c_value, p_h_value = model.find_p_q_combination(solution.x)
-                if p_c_value < 1e-11:
-                    p_c_value = 0
-                if p_h_value < 1e-11:
-                    p_h_value = 0
-                solution_c_matrix[i, j] = p_c_value
-                solution_h_matrix[i, j] = p_h_value
-        return solution_c_matrix, solution_h_matrix
-
-    def visitor_worker(r_c, p_b, r_f, r_v, r_w, h, model):
+        axes = {'r_w': np.linspace(0*r_w, 2*r_w, n),
+                'p_f': np.linspace(0, 1, n)}
+        return Combination.sweep(model, axes, r=(r_c, p_b, r_f, r_v, r_w),
+                                 h=h, method=method, cache=cache)
+
+    def visitor_worker(r_c, p_b, r_f, r_v, r_w, h, model, method='auto',
+                       cache=None, n=300):
         """Method calculates the probability of a major outbreak for varying
         average expected number of infections of healthcare facility visitors,
         and average expected number of infections of healthcare workers.
@@ -84,6 +511,13 @@ class Combination:
             Probability of hospitalisation
         model : class
             Instance of the class for the model
+        method : str
+            Solver used by `pmo_batch`
+        cache : DiskCache
+            Cache the grid is loaded from or stored in, or None to always
+            compute it
+        n : int
+            Number of grid points along each axis
         
         Returns
         -------
@@ -91,37 +525,13 @@ class Combination:
             Probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility
         """
-        solution_c_matrix = np.zeros((300, 300))
-        solution_h_matrix = np.zeros((300, 300))
-        r_v_ = np.linspace(0*r_v, 2*r_v, 300)
-        r_w_ = np.linspace(0*r_w, 2*r_w, 300)
-
-        for i in range(len(r_w_)):
-            for j in range(len(r_v_)):
-                def equations(vars):
-                    x, y, z = vars
-                    eq1 = (r_c*(1 - h)) / (r_c + 1) *x**2 +\
-                        (r_c*h) / (r_c + 1) *x*z +\
-                        p_b / (r_c + 1) *y +\
-                        (1 - p_b) / (r_c + 1) - x
-                    eq2 = (r_f*(1 - h)) / (r_f + 1) *x*y +\
-                        (r_f*h) / (r_f + 1) *y*z + 1 / (r_f + 1) - y
-                    eq3 = (r_v_[j]*(1 - h)) / (r_v_[j] + r_w_[i] + 1) *x*z +\
-                        (h*r_v_[j] + r_w_[i]) / (r_v_[j] + r_w_[i] + 1) * z**2 +\
-                        1 / (r_v_[j] + r_w_[i] + 1) - z
-                    return [eq1, eq2, eq3]
-
-                solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-                p_c_value, p_h_value = model.find_p_q_combination(solution.x)
-                if p_c_value < 1e-11:
-                    p_c_value = 0
-                if p_h_value < 1e-11:
-                    p_h_value = 0
-                solution_c_matrix[i, j] = p_c_value
-                solution_h_matrix[i, j] = p_h_value
-        return solution_c_matrix, solution_h_matrix
-    
-    def hospitalisation_community(r_c, p_b, r_f, r_v, r_w, model):
+        axes = {'r_w': np.linspace(0*r_w, 2*r_w, n),
+                'r_v': np.linspace(0*r_v, 2*r_v, n)}
+        return Combination.sweep(model, axes, r=(r_c, p_b, r_f, r_v, r_w),
+                                 h=h, method=method, cache=cache)
+
+    def hospitalisation_community(r_c, p_b, r_f, r_v, r_w, model,
+                                  method='auto', cache=None, n=300):
         """Method calculates the probability of a major outbreak for varying
         average expected number of infections within the community, and
         probability of hospitalisation.
@@ -141,6 +551,13 @@ class Combination:
             Average expected number of infections of healthcare workers
         model : class
             Instance of the class for the model
+        method : str
+            Solver used by `pmo_batch`
+        cache : DiskCache
+            Cache the grid is loaded from or stored in, or None to always
+            compute it
+        n : int
+            Number of grid points along each axis
             
         Returns
         -------
@@ -148,28 +565,7 @@ class Combination:
             Probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility
         """
-        solution_c_matrix = np.zeros((300, 300))
-        solution_h_matrix = np.zeros((300, 300))
-        h = np.linspace(0, 1, 300)
-        r_c_ = np.linspace(0*r_c, 2*r_c, 300)
-
-        for i in range(len(r_c_)):
-            for j in range(len(h)):
-                def equations(vars):
-                    x, y, z = vars
-                    eq1 = (r_c_[i]*(1 - h[j])) / (r_c_[i] + 1) *x**2 +\
-                          (r_c_[i]*h[j]) / (r_c_[i] + 1) *x*z +\
-                          p_b / (r_c_[i] + 1) *y +\
-                          (1 - p_b) / (r_c_[i] + 1) - x
-                    eq2 = (r_f*(1 - h[j])) / (r_f + 1) *x*y +\
-                          (r_f*h[j]) / (r_f + 1) *y*z + 1 / (r_f + 1) - y
-                    eq3 = (r_v*(1 - h[j])) / (r_v + r_w + 1) *x*z +\
-                          (h[j]*r_v + r_w) / (r_v + r_w + 1) * z**2 +\
-                          1 / (r_v + r_w + 1) - z
-                    return [eq1, eq2, eq3]
-
-                solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-                p_c_value, p_h_value = model.find_p_q_combination(solution.x)
-                solution_c_matrix[i, j] = p_c_value
-                solution_h_matrix[i, j] = p_h_value
-        return solution_c_matrix, solution_h_matrix
+        axes = {'r_c': np.linspace(0*r_c, 2*r_c, n),
+                'h': np.linspace(0, 1, n)}
+        return Combination.sweep(model, axes, r=(r_c, p_b, r_f, r_v, r_w),
+                                 method=method, cache=cache)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from ebola_model.functions.probability import _newton, _newton_point
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+AVAILABLE = numba is not None
+
+if AVAILABLE:
+    _newton_point_compiled = numba.njit(cache=True)(_newton_point)
+
+    @numba.njit(parallel=True, cache=True)
+    def _newton_points(coef, tol, max_iter, s, n_iter, converged):
+        """Function runs the compiled `_newton_point` from (0, 0, 0) for each
+        row of coef, in parallel over the rows.
+        """
+        for k in numba.prange(coef.shape[0]):
+            x, y, z, n, done, _ = _newton_point_compiled(
+                0.0, 0.0, 0.0, coef[k], tol, max_iter, True)
+            s[0, k], s[1, k], s[2, k] = x, y, z
+            n_iter[k] = n
+            converged[k] = done
+
+
+def newton_batch(coef, tol=1e-12, max_iter=1000):
+    """Function solves a batch of points with Newton's method in a kernel
+    compiled by Numba, which runs the points in parallel without Python
+    overhead. Where Numba is not installed the points are solved by the
+    NumPy implementation `_newton` instead, which agrees to within tol.
+
+    Parameters
+    ----------
+    coef : np.array
+        Array of shape (10, n) of coefficients from `_coefficients`
+    tol : float
+        Tolerance on the size of the step at which a point has converged
+    max_iter : int
+        Maximum number of iterations
+
+    Returns
+    -------
+    tuple[np.array, np.array, np.array]
+        Solutions of shape (3, n), the numbers of iterations and whether
+        each point converged
+    """
+    n = coef.shape[1]
+    if not AVAILABLE:
+        return _newton(np.zeros((3, n)), coef, tol, max_iter)
+    s = np.zeros((3, n))
+    n_iter = np.zeros(n, dtype=np.int64)
+    converged = np.zeros(n, dtype=np.bool_)
+    _newton_points(np.ascontiguousarray(coef.T), tol, max_iter, s, n_iter,
+                   converged)
+    return s, n_iter, converged
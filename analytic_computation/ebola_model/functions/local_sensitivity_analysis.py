@@ -1,13 +1,66 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from ebola_model.functions import probability as p
+from ebola_model.functions.cache import cached
 
 class LSA:
-    def __init__(self, model):
-        p.PMO = model
+    def __init__(self, model, cache=None):
+        self.model = model
+        self.cache = cache
         self.gradients_c = []
         self.gradients_h = []
 
+    def sweep(self, name, r_c, p_b, r_f, r_v, r_w, h):
+        """Method calculates the probabilities of a major outbreak along a
+        sweep of one variable by continuation, loading the sweep from the
+        cache of the instance if it has been computed before.
+
+        Parameters
+        ----------
+        name : str
+            Name of the sweep
+        r_c, p_b, r_f, r_v, r_w, h : float or np.array
+            Variables of the model, one of which is the array swept over
+
+        Returns
+        -------
+        tuple[np.array, np.array]
+            Probabilities that an outbreak occurs and is treated
+            initially in the community and in a healthcare facility
+        """
+        def compute():
+            solution = p.pmo_sweep(r_c, p_b, r_f, r_v, r_w, h)
+            return solution.p_c, solution.p_h
+
+        inputs = {'r_c': r_c, 'p_b': p_b, 'r_f': r_f, 'r_v': r_v, 'r_w': r_w,
+                  'h': h, 'method': 'pmo_sweep'}
+        return cached(self.cache, name, inputs, compute)
+
+    def elasticities(self, r, h):
+        """Method calculates the local sensitivities of the probability of a
+        major outbreak to (r_c, p_f, r_v, r_w, 1-h) from a single solve, using
+        the implicit function theorem. Each is the derivative multiplied by
+        the value of the variable, as held in `gradients_c` and `gradients_h`.
+
+        Parameters
+        ----------
+        r : tuple
+            Parameters that define the model
+        h : float
+            Probability of treatment in a healthcare facility
+
+        Returns
+        -------
+        tuple[list, list]
+            Local sensitivities of the probabilities that an outbreak occurs
+            and is treated initially in the community and in a healthcare
+            facility
+        """
+        _, d_c, d_h = p.pmo_sensitivity(r[0], r[1], r[2], r[3], r[4], h)
+        scale = np.array([r[0], r[1], r[3], r[4], -(1-h)])
+        elasticities_c = d_c[[0, 1, 3, 4, 5]]*scale
+        elasticities_h = d_h[[0, 1, 3, 4, 5]]*scale
+        return elasticities_c.tolist(), elasticities_h.tolist()
+
     def community_infections(self, r, h):
         """Method calculates the probability of a major outbreak given the
         average expected number of infections in the community.
@@ -21,24 +74,20 @@ class LSA:
 
         Returns
         -------
-        tuple[list, list, array]
-            List of probabilities that an outbreak occurs and is treated
+        tuple[array, array, array]
+            Arrays of probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility and the
             array of expected number of community infections.
         """
-        p.PMO.q_c_values = []
-        p.PMO.q_h_values = []
-        p.PMO.p_c_values = []
-        p.PMO.p_h_values = []
         x = np.linspace(0*r[0], 2*r[0], 10000)
-        for r_c_ in x:
-            p_c_values, p_h_values = p.PMO.pmo(r_c_, r[1], r[2], r[3], r[4], h)
+        p_c_values, p_h_values = self.sweep('community_infections', x, r[1],
+                                            r[2], r[3], r[4], h)
         gradient_c, gradient_h = np.gradient(p_c_values, x), np.gradient(p_h_values, x)
         self.gradients_c.append(gradient_c[5000]*r[0])
         self.gradients_h.append(gradient_h[5000]*r[0])
         return p_c_values, p_h_values, x
 
-    def plot_community_infections(self, r, h):
+    def plot_community_infections(self, r, h, values=None, show=True):
         """Method plots the probability of a major outbreak against the average
         expected number of infections in the community.
         
@@ -48,8 +97,17 @@ class LSA:
             Parameters that define the model
         h : float
             Probability of treatment in a healthcare facility
+        values : tuple
+            Arrays returned by the method calculating the probabilities, which
+            is called if values is None
+        show : bool
+            Whether to show the figure
         """
-        p_c_values, p_h_values, x = self.community_infections(r, h)
+        import matplotlib.pyplot as plt
+
+        if values is None:
+            values = self.community_infections(r, h)
+        p_c_values, p_h_values, x = values
 
         plt.figure(figsize = [8, 6])
         plt.plot(x, p_c_values, label='First case C', color='red')
@@ -71,7 +129,8 @@ class LSA:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
 
     def funeral_infections(self, r, h):
         """Method calculates the probability of a major outbreak given the
@@ -86,24 +145,21 @@ class LSA:
         
         Returns
         -------
-        tuple[list, list, array]
-            List of probabilities that an outbreak occurs and is treated
+        tuple[array, array, array]
+            Arrays of probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility and the
             array of probabilities of an unsafe burial given death.
         """
-        p.PMO.q_c_values = []
-        p.PMO.q_h_values = []
-        p.PMO.p_c_values = []
-        p.PMO.p_h_values = []
         x = np.linspace(0, 1, 10000)
-        for p_f in x:
-            p_c_values, p_h_values = p.PMO.pmo(r[0], r[1]/(0.4/0.7)*p_f, r[2], r[3], r[4], h)
+        p_c_values, p_h_values = self.sweep('funeral_infections', r[0],
+                                            r[1]/(0.4/0.7)*x, r[2], r[3],
+                                            r[4], h)
         gradient_c, gradient_h = np.gradient(p_c_values, x), np.gradient(p_h_values, x)
         self.gradients_c.append(gradient_c[5714]*(0.4/0.7))
         self.gradients_h.append(gradient_h[5714]*(0.4/0.7))
         return p_c_values, p_h_values, x
 
-    def plot_funeral_infections(self, r, h):
+    def plot_funeral_infections(self, r, h, values=None, show=True):
         """Method plots the probability of a major outbreak against the
         probability of an unsafe burial given death.
         
@@ -113,8 +169,17 @@ class LSA:
             Parameters that define the model
         h : float
             Probability of treatment in a healthcare facility
+        values : tuple
+            Arrays returned by the method calculating the probabilities, which
+            is called if values is None
+        show : bool
+            Whether to show the figure
         """
-        p_c_values, p_h_values, x = self.funeral_infections(r, h)
+        import matplotlib.pyplot as plt
+
+        if values is None:
+            values = self.funeral_infections(r, h)
+        p_c_values, p_h_values, x = values
 
         plt.figure(figsize = [8, 6])
         plt.plot(x, p_c_values, label='First case C', color='red')
@@ -134,7 +199,8 @@ class LSA:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
 
     def hospital_visitors(self, r, h):
         """Method calculates the probability of a major outbreak given the
@@ -149,24 +215,20 @@ class LSA:
             
         Returns
         -------
-        tuple[list, list, array]
-            List of probabilities that an outbreak occurs and is treated
+        tuple[array, array, array]
+            Arrays of probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility and the
             array of expected number of healthcare facility visitor infections.
         """
-        p.PMO.q_c_values = []
-        p.PMO.q_h_values = []
-        p.PMO.p_c_values = []
-        p.PMO.p_h_values = []
         x = np.linspace(0*r[3], 2*r[3], 10000)
-        for r_v_ in x:
-            p_c_values, p_h_values = p.PMO.pmo(r[0], r[1], r[2], r_v_, r[4], h)
+        p_c_values, p_h_values = self.sweep('hospital_visitors', r[0], r[1],
+                                            r[2], x, r[4], h)
         gradient_c, gradient_h = np.gradient(p_c_values, x), np.gradient(p_h_values, x)
         self.gradients_c.append(gradient_c[5000]*r[3])
         self.gradients_h.append(gradient_h[5000]*r[3])
         return p_c_values, p_h_values, x
 
-    def plot_hospital_visitors(self, r, h):
+    def plot_hospital_visitors(self, r, h, values=None, show=True):
         """Method plots the probability of a major outbreak against the average
         expected number of healthcare facility visitor infections.
 
@@ -176,8 +238,17 @@ class LSA:
             Parameters that define the model
         h : float
             Probability of treatment in a healthcare facility
+        values : tuple
+            Arrays returned by the method calculating the probabilities, which
+            is called if values is None
+        show : bool
+            Whether to show the figure
         """
-        p_c_values, p_h_values, x = self.hospital_visitors(r, h)
+        import matplotlib.pyplot as plt
+
+        if values is None:
+            values = self.hospital_visitors(r, h)
+        p_c_values, p_h_values, x = values
 
         plt.figure(figsize = [8, 6])
         plt.plot(x, p_c_values, label='First case C', color='red')
@@ -199,7 +270,8 @@ class LSA:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
 
     def hcw_infections(self, r, h):
         """Method calculates the probability of a major outbreak given the
@@ -214,24 +286,20 @@ class LSA:
             
         Returns
         -------
-        tuple[list, list, array]
-            List of probabilities that an outbreak occurs and is treated
+        tuple[array, array, array]
+            Arrays of probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility and the
             array of expected number of healthcare worker infections.
         """
-        p.PMO.q_c_values = []
-        p.PMO.q_h_values = []
-        p.PMO.p_c_values = []
-        p.PMO.p_h_values = []
         x = np.linspace(0*r[4], 2*r[4], 10000)
-        for r_w_ in x:
-            p_c_values, p_h_values = p.PMO.pmo(r[0], r[1], r[2], r[3], r_w_, h)
+        p_c_values, p_h_values = self.sweep('hcw_infections', r[0], r[1],
+                                            r[2], r[3], x, h)
         gradient_c, gradient_h = np.gradient(p_c_values, x), np.gradient(p_h_values, x)
         self.gradients_c.append(gradient_c[5000]*r[4])
         self.gradients_h.append(gradient_h[5000]*r[4])
         return p_c_values, p_h_values, x
 
-    def plot_hcw_infections(self, r, h):
+    def plot_hcw_infections(self, r, h, values=None, show=True):
         """Method plots the probability of a major outbreak against the average
         expected number of healthcare worker infections.
         
@@ -241,8 +309,17 @@ class LSA:
             Parameters that define the model
         h : float
             Probability of treatment in a healthcare facility
+        values : tuple
+            Arrays returned by the method calculating the probabilities, which
+            is called if values is None
+        show : bool
+            Whether to show the figure
         """
-        p_c_values, p_h_values, x = self.hcw_infections(r, h)
+        import matplotlib.pyplot as plt
+
+        if values is None:
+            values = self.hcw_infections(r, h)
+        p_c_values, p_h_values, x = values
 
         plt.figure(figsize = [8, 6])
         plt.plot(x, p_c_values, label='First case C', color='red')
@@ -264,7 +341,8 @@ class LSA:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
 
     def hosp_pmo(self, r, h):
         """Method calculates the probability of a major outbreak given the
@@ -279,24 +357,21 @@ class LSA:
         
         Returns
         -------
-        tuple[list, list, array]
-            List of probabilities that an outbreak occurs and is treated
+        tuple[array, array, array]
+            Arrays of probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility and the
             array of probabilities of treatment in a healthcare facility.
         """
-        p.PMO.q_c_values = []
-        p.PMO.q_h_values = []
-        p.PMO.p_c_values = []
-        p.PMO.p_h_values = []
         x = np.linspace(0, 1, 10000)
-        for h_ in np.linspace(1, 0, 10000):
-            p_c_values, p_h_values = p.PMO.pmo(r[0], r[1], r[2], r[3], r[4], h_)
+        p_c_values, p_h_values = self.sweep('hosp_pmo', r[0], r[1], r[2],
+                                            r[3], r[4],
+                                            np.linspace(1, 0, 10000))
         gradient_c, gradient_h = np.gradient(p_c_values, x), np.gradient(p_h_values, x)
         self.gradients_c.append(gradient_c[4000]*0.4)
         self.gradients_h.append(gradient_h[4000]*0.4)
         return p_c_values, p_h_values, x
 
-    def plot_hosp_pmo(self, r, h):
+    def plot_hosp_pmo(self, r, h, values=None, show=True):
         """Method plots the probability of a major outbreak against the
         probability of treatment in the community.
         
@@ -306,8 +381,17 @@ class LSA:
             Parameters that define the model
         h : float
             Probability of treatment in a healthcare facility
+        values : tuple
+            Arrays returned by the method calculating the probabilities, which
+            is called if values is None
+        show : bool
+            Whether to show the figure
         """
-        p_c_values, p_h_values, x = self.hosp_pmo(r, h)
+        import matplotlib.pyplot as plt
+
+        if values is None:
+            values = self.hosp_pmo(r, h)
+        p_c_values, p_h_values, x = values
 
         plt.figure(figsize = [8, 6])
         plt.plot(x, p_c_values, label='First case C', color='red')
@@ -327,4 +411,5 @@ class LSA:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
@@ -1,6 +1,9 @@
-from scipy.optimize import root
+import math
+import time
 import numpy as np
 
+from ebola_model.functions.cache import LRUCache
+
 class PMO:
     def __init__(self, d, f, N, q, phi, lambda_h, beta, alpha):
         self.d = d
@@ -11,42 +14,60 @@ class PMO:
         self.lambda_h = lambda_h
         self.beta = beta
         self.alpha = alpha
-        self.q_c_values = []
-        self.q_h_values = []
-        self.p_c_values = []
-        self.p_h_values = []
+        self.cache = None
+        self.cache_decimals = None
+
+    def enable_cache(self, maxsize=1024, decimals=None):
+        """Method turns on memoization of `pmo`, keyed on the variables of
+        the model and the solver.
+
+        Parameters
+        ----------
+        maxsize : int
+            Maximum number of parameter sets held before the least recently
+            used one is evicted
+        decimals : int
+            Number of decimals the variables are rounded to before lookup,
+            or None to key on the exact values. Rounded variables are also
+            the ones solved, so results do not depend on the call order
+
+        Returns
+        -------
+        LRUCache
+            Cache holding the hit and miss counters
+        """
+        self.cache = LRUCache(maxsize)
+        self.cache_decimals = decimals
+        return self.cache
+
+    def disable_cache(self):
+        """Method turns off memoization of `pmo` and drops the cache.
+        """
+        self.cache = None
+        self.cache_decimals = None
 
     def find_p_q(self, solution):
-        """Method calculates a list of probabilities of a major outbreak given
-        the probability that an outbreak does not occur.
+        """Method calculates the probabilities of a major outbreak given the
+        probabilities that an outbreak does not occur.
 
         Parameters
         ----------
         solution : array
-            Probabilities that an outbreak occurs and is treated
-            initially in the community and in a healthcare facility
+            Probabilities that an outbreak does not occur after being treated
+            initially in the community, after an unsafe burial and after being
+            treated initially in a healthcare facility
 
         Returns
         -------
-        tuple[list, list]
-            List of probabilities that an outbreak occurs and is treated
+        tuple[float, float]
+            Probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility
         """
-        self.q_c_values.append(solution[0])
-        self.q_h_values.append(solution[2])
-        if 1 - solution[0] < 0:
-            self.p_c_values.append(0.0)
-        else:
-            self.p_c_values.append(1.0 - solution[0])
-        if 1 - solution[2] < 0:
-            self.p_h_values.append(0.0)
-        else:
-            self.p_h_values.append(1.0 - solution[2])
-        return self.p_c_values, self.p_h_values
+        return max(1.0 - solution[0], 0.0), max(1.0 - solution[2], 0.0)
     
     def find_p_q_combination(self, solution):
         """Method calculates the probability of a major outbreak given the
-        probability that an outbreak does not occur.
+        probability that an outbreak does not occur, as `find_p_q`.
 
         Parameters
         ----------
@@ -60,17 +81,7 @@ class PMO:
             Probabilities that an outbreak occurs and is treated
             initially in the community and in a healthcare facility
         """
-        self.q_c_values.append(solution[0])
-        self.q_h_values.append(solution[2])
-        if 1 - solution[0] < 0:
-            self.p_c_value = 0.0
-        else:
-            self.p_c_value = 1.0 - solution[0]
-        if 1 - solution[2] < 0:
-            self.p_h_value = 0.0
-        else:
-            self.p_h_value= 1.0 - solution[2]
-        return self.p_c_value, self.p_h_value
+        return self.find_p_q(solution)
 
     def variables(self):
         """Method calculates the parameters of the model.
@@ -82,7 +93,7 @@ class PMO:
         r_w = self.N * self.q * self.beta * self.alpha
         return r_c, p_b, r_f, r_v, r_w
 
-    def pmo(self, r_c, p_b, r_f, r_v, r_w, h):
+    def pmo(self, r_c, p_b, r_f, r_v, r_w, h, method='auto'):
         """Method calculates the probability of a major outbreak given the
         variables of the model.
 
@@ -100,24 +111,35 @@ class PMO:
             Average expected number of infections of healthcare workers
         h : float
             Probability of hospitalisation
+        method : str
+            Solver used by `pmo_batch`
+
+        Returns
+        -------
+        tuple[float, float]
+            Probabilities that an outbreak occurs and is treated
+            initially in the community and in a healthcare facility
+        """
+        if self.cache is None:
+            return self._pmo(r_c, p_b, r_f, r_v, r_w, h, method)
+        variables = [float(v) for v in (r_c, p_b, r_f, r_v, r_w, h)]
+        if self.cache_decimals is not None:
+            variables = [round(v, self.cache_decimals) for v in variables]
+        key = tuple(variables) + (method,)
+        p_values = self.cache.get(key)
+        if p_values is None:
+            p_values = self._pmo(*variables, method)
+            self.cache.put(key, p_values)
+        return p_values
+
+    def _pmo(self, r_c, p_b, r_f, r_v, r_w, h, method):
+        """Method solves `pmo` without consulting the cache.
         """
-        def equations(vars):
-            x, y, z = vars
-            eq1 = (r_c * (1 - h)) / (r_c + 1) * x ** 2 +\
-                  (r_c * h) / (r_c + 1) * x * z + p_b / (r_c + 1) * y +\
-                  (1 - p_b) / (r_c + 1) - x
-            eq2 = (r_f * (1 - h)) / (r_f + 1) * x * y +\
-                  (r_f * h) / (r_f + 1) * y * z + 1 / (r_f + 1) - y
-            eq3 = (r_v * (1 - h)) / (r_v + r_w + 1) * x * z +\
-                  (h * r_v + r_w) / (r_v + r_w + 1) * z ** 2 +\
-                  1 / (r_v + r_w + 1) - z
-            return [eq1, eq2, eq3]
-
-        solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-        self.find_p_q(solution.x)
-        return self.p_c_values, self.p_h_values
+        solution = pmo_batch(r_c, p_b, r_f, r_v, r_w, h, method=method)
+        return self.find_p_q([float(solution.q_c), float(solution.q_f),
+                              float(solution.q_h)])
     
-    def pmo_burial_compliance(self, alpha, r, h=0.6):
+    def pmo_burial_compliance(self, alpha, r, h=0.6, method='auto'):
         """Method calculates the probability of a major outbreak for varying
         levels of burial compliance and given effectiveness of barrier nursing.
 
@@ -129,25 +151,926 @@ class PMO:
             Parameters that define the model
         h : float
             Probability of hospitalisation
+        method : str
+            Solver used by `pmo_batch`
+
+        Returns
+        -------
+        tuple[np.array, np.array]
+            Probabilities that an outbreak occurs and is treated
+            initially in the community and in a healthcare facility
         """
-        self.q_c_values = []
-        self.q_h_values = []
-        self.p_c_values = []
-        self.p_h_values = []
-        for p_f in np.linspace(0.4/0.7, 0, 1000):
-            def equations(vars):
-                x, y, z = vars
-                eq1 = (r[0]*(1 - h)) / (r[0] + 1) *x**2 +\
-                          (r[0]*h) / (r[0] + 1) *x*z +\
-                          0.7*p_f / (r[0] + 1) *y +\
-                          (1 - 0.7*p_f) / (r[0] + 1) - x
-                eq2 = (r[2]*(1 - h)) / (r[2] + 1) *x*y +\
-                        (r[2]*h) / (r[2] + 1) *y*z + 1 / (r[2] + 1) - y
-                eq3 = (r[3]*(1 - h)) / (r[3] + r[4]/0.2*alpha + 1) *x*z +\
-                        (h*r[3] + r[4]/0.2*alpha) / (r[3] + r[4]/0.2*alpha + 1) * z**2 +\
-                        1 / (r[3] + r[4]/0.2*alpha + 1) - z
-                return [eq1, eq2, eq3]
-
-            solution = root(equations, [0.5, 0.5, 0.5], method='lm')
-            self.find_p_q(solution.x)
-        return self.p_c_values, self.p_h_values
+        p_f = np.linspace(0.4/0.7, 0, 1000)
+        solution = pmo_batch(r[0], 0.7*p_f, r[2], r[3], r[4]/0.2*alpha, h,
+                             method=method)
+        return solution.p_c, solution.p_h
+
+
+LADDER = ('newton', 'reduced', 'anderson', 'lm')
+
+_EPS = np.finfo(float).eps
+
+
+class ConvergenceError(RuntimeError):
+    """Error raised when points of a batch are not solved to a certified
+    minimal root by any method of the fallback ladder.
+    """
+
+
+class Telemetry:
+    """Class counts, for each method used by `pmo_batch`, the points it was
+    tried on and solved, the iterations it took (function evaluations for
+    the 'lm' method) and the time it took, together with the points no
+    method solved. `telemetry` collects the counts of every batch solved in
+    the process.
+    """
+    def __init__(self):
+        self.counts = {}
+        self.failures = 0
+
+    def record(self, method, points, solved, n_iter, seconds):
+        """Method adds the counts of one attempt of a method to the totals.
+        """
+        counts = self.counts.setdefault(method, {'points': 0, 'solved': 0,
+                                                 'n_iter': 0, 'time': 0.0})
+        counts['points'] += points
+        counts['solved'] += solved
+        counts['n_iter'] += n_iter
+        counts['time'] += seconds
+
+    def merge(self, other):
+        """Method adds the counts of another instance to the totals.
+        """
+        for method, counts in other.counts.items():
+            self.record(method, counts['points'], counts['solved'],
+                        counts['n_iter'], counts['time'])
+        self.failures += other.failures
+
+    def reset(self):
+        """Method sets all counts back to 0.
+        """
+        self.counts = {}
+        self.failures = 0
+
+
+telemetry = Telemetry()
+
+
+def counted(function, *args):
+    """Function calls function with args while `telemetry` counts the
+    solves of that call alone, and then restores `telemetry`. The caller adds
+    the counts to `telemetry` itself, which is how the counts of a call made
+    in a worker process reach the parent process.
+
+    Parameters
+    ----------
+    function : callable
+        Function that solves the model
+    args : tuple
+        Arguments of function
+
+    Returns
+    -------
+    tuple[object, Telemetry]
+        Result of the call and the counts of its solves
+    """
+    saved = Telemetry()
+    saved.merge(telemetry)
+    telemetry.reset()
+    try:
+        result = function(*args)
+    except BaseException:
+        telemetry.merge(saved)
+        raise
+    counts = Telemetry()
+    counts.merge(telemetry)
+    telemetry.reset()
+    telemetry.merge(saved)
+    return result, counts
+
+
+class Solution:
+    """Class stores the solution of the extinction equations for a batch of
+    parameter points.
+
+    Parameters
+    ----------
+    q_c : np.array
+        Probabilities that an outbreak does not occur after being treated
+        initially in the community
+    q_f : np.array
+        Probabilities that an outbreak does not occur after an unsafe burial
+    q_h : np.array
+        Probabilities that an outbreak does not occur after being treated
+        initially in a healthcare facility
+    n_iter : np.array
+        Number of iterations used at each point
+    converged : np.array
+        Whether each point met the tolerance within the iteration cap
+    skipped : np.array
+        Whether each point was found to be subcritical and not solved
+    residual : np.array
+        Largest absolute residual of the extinction equations at each point
+    method : np.array
+        Method that solved each point, 'skipped' at subcritical points and
+        'failed' where no method did
+    telemetry : Telemetry
+        Counts of the methods used for the batch
+    """
+    def __init__(self, q_c, q_f, q_h, n_iter=None, converged=None,
+                 skipped=None, residual=None, method=None, telemetry=None):
+        self.q_c = q_c
+        self.q_f = q_f
+        self.q_h = q_h
+        self.p_c = 1.0 - q_c
+        self.p_h = 1.0 - q_h
+        self.n_iter = n_iter
+        self.converged = converged
+        self.skipped = skipped
+        self.residual = residual
+        self.method = method
+        self.telemetry = telemetry
+
+
+def _coefficients(r_c, p_b, r_f, r_v, r_w, h):
+    """Function calculates the coefficients of the offspring generating
+    functions written out in `PMO.pmo`.
+
+    Returns
+    -------
+    np.array
+        Array of shape (10, ...) holding the coefficients of x**2, x*z, y and
+        the constant in eq1, of x*y, y*z and the constant in eq2, and of x*z, z**2
+        and the constant in eq3
+    """
+    coef = np.broadcast_arrays((r_c * (1 - h)) / (r_c + 1),
+                               (r_c * h) / (r_c + 1),
+                               p_b / (r_c + 1),
+                               (1 - p_b) / (r_c + 1),
+                               (r_f * (1 - h)) / (r_f + 1),
+                               (r_f * h) / (r_f + 1),
+                               1 / (r_f + 1),
+                               (r_v * (1 - h)) / (r_v + r_w + 1),
+                               (h * r_v + r_w) / (r_v + r_w + 1),
+                               1 / (r_v + r_w + 1))
+    return np.array(coef, dtype=float)
+
+
+def _residual(s, coef):
+    """Function calculates the left hand sides of the extinction equations
+    for the coefficients returned by `_coefficients`.
+    """
+    x, y, z = s
+    return np.array([coef[0] * x**2 + coef[1] * x * z + coef[2] * y +
+                     coef[3] - x,
+                     coef[4] * x * y + coef[5] * y * z + coef[6] - y,
+                     coef[7] * x * z + coef[8] * z**2 + coef[9] - z])
+
+
+def _jacobian(s, coef):
+    """Function calculates the Jacobian of `_residual` with respect to
+    (x, y, z).
+    """
+    x, y, z = s
+    jac = np.zeros((3, 3) + np.shape(x))
+    jac[0, 0] = 2 * coef[0] * x + coef[1] * z - 1
+    jac[0, 1] = coef[2]
+    jac[0, 2] = coef[1] * x
+    jac[1, 0] = coef[4] * y
+    jac[1, 1] = coef[4] * x + coef[5] * z - 1
+    jac[1, 2] = coef[5] * y
+    jac[2, 0] = coef[7] * z
+    jac[2, 2] = coef[7] * x + 2 * coef[8] * z - 1
+    return jac
+
+
+def residual(s, r_c, p_b, r_f, r_v, r_w, h):
+    """Function calculates the left hand sides of the extinction equations,
+    whose minimal non-negative root gives the probabilities that an outbreak
+    does not occur.
+
+    Parameters
+    ----------
+    s : np.array
+        Array of shape (3,) or (3, ...) of the probabilities (x, y, z) that an
+        outbreak does not occur after a case in the community, an unsafe
+        burial and a case in a healthcare facility
+    r_c : float or np.array
+        Average expected number of infections within the community
+    p_b : float or np.array
+        Probability of an unsafe burial
+    r_f : float or np.array
+        Average expected number of infections from an unsafe burial
+    r_v : float or np.array
+        Average expected number of infections of healthcare facility visitors
+    r_w : float or np.array
+        Average expected number of infections of healthcare workers
+    h : float or np.array
+        Probability of hospitalisation
+
+    Returns
+    -------
+    np.array
+        Residuals of eq1, eq2 and eq3, with the shape of s
+    """
+    return _residual(s, _coefficients(r_c, p_b, r_f, r_v, r_w, h))
+
+
+def jacobian(s, r_c, p_b, r_f, r_v, r_w, h):
+    """Function calculates the Jacobian of `residual` with respect to
+    (x, y, z).
+
+    Parameters
+    ----------
+    s : np.array
+        Array of shape (3,) or (3, ...) of the probabilities (x, y, z) that an
+        outbreak does not occur
+    r_c, p_b, r_f, r_v, r_w, h : float or np.array
+        Variables of the model, as in `residual`
+
+    Returns
+    -------
+    np.array
+        Jacobian of shape (3, 3) or (3, 3, ...), where the first axis indexes
+        the equations and the second the unknowns
+    """
+    return _jacobian(s, _coefficients(r_c, p_b, r_f, r_v, r_w, h))
+
+
+def _minors(a):
+    """Function calculates the leading principal minors of a batch of 3x3
+    matrices a of shape (3, 3, ...), as an array of shape (3, ...). A matrix
+    with non-positive off-diagonal entries, such as I - G'(s), is a
+    non-singular M-matrix exactly when all three are positive.
+    """
+    minor_2 = a[0, 0] * a[1, 1] - a[0, 1] * a[1, 0]
+    det = (a[0, 0] * (a[1, 1] * a[2, 2] - a[1, 2] * a[2, 1]) +
+           a[0, 1] * (a[1, 2] * a[2, 0] - a[1, 0] * a[2, 2]) +
+           a[0, 2] * (a[1, 0] * a[2, 1] - a[1, 1] * a[2, 0]))
+    return np.array([a[0, 0], minor_2, det])
+
+
+def _subcritical(coef):
+    """Function tests which points are subcritical, where the mean offspring
+    matrix M = G'(1) has spectral radius below 1 and the minimal root is
+    (1, 1, 1). Since M is non-negative this holds exactly when I - M is a
+    non-singular M-matrix.
+    """
+    a = -_jacobian(np.ones((3,) + coef.shape[1:]), coef)
+    return np.all(_minors(a) > 0, axis=0)
+
+
+def _certified(s, coef, tol=1e-10):
+    """Function tests which solutions are roots whose residuals are within
+    tol and at which I - G'(s) is a non-singular M-matrix, up to tol, which
+    by convexity makes them the minimal root.
+    """
+    return ((np.max(np.abs(_residual(s, coef)), axis=0) <= tol) &
+            np.all(_minors(-_jacobian(s, coef)) > -tol, axis=0))
+
+
+def reproduction_number(r_c, p_b, r_f, r_v, r_w, h):
+    """Function calculates the reproduction number of the model, the
+    spectral radius of the mean offspring matrix M = G'(1). An outbreak is
+    possible exactly where it is above 1, so its level set at 1 is the
+    critical surface of the model.
+
+    Parameters
+    ----------
+    r_c, p_b, r_f, r_v, r_w, h : float or np.array
+        Variables of the model, as in `pmo_batch`
+
+    Returns
+    -------
+    np.array
+        Reproduction numbers with the broadcast shape of the variables
+    """
+    coef = _coefficients(r_c, p_b, r_f, r_v, r_w, h)
+    mean = _jacobian(np.ones((3,) + coef.shape[1:]), coef)
+    mean[0, 0] += 1
+    mean[1, 1] += 1
+    mean[2, 2] += 1
+    eigenvalues = np.linalg.eigvals(np.moveaxis(mean, (0, 1), (-2, -1)))
+    return np.max(np.abs(eigenvalues), axis=-1)
+
+
+def _solve3(a, b):
+    """Function solves a batch of 3x3 linear systems a @ x = b by Cramer's
+    rule, so that singular points do not interrupt the rest of the batch.
+
+    Parameters
+    ----------
+    a : np.array
+        Array of shape (3, 3, n) of matrices
+    b : np.array
+        Array of shape (3, n) of right hand sides
+
+    Returns
+    -------
+    tuple[np.array, np.array]
+        Solutions of shape (3, n) and a boolean array that is True where a is
+        a non-singular M-matrix, in which case a has a non-negative inverse
+    """
+    minors = _minors(a)
+    c22, det = minors[1], minors[2]
+    c00 = a[1, 1] * a[2, 2] - a[1, 2] * a[2, 1]
+    c01 = a[1, 2] * a[2, 0] - a[1, 0] * a[2, 2]
+    c02 = a[1, 0] * a[2, 1] - a[1, 1] * a[2, 0]
+    c10 = a[0, 2] * a[2, 1] - a[0, 1] * a[2, 2]
+    c11 = a[0, 0] * a[2, 2] - a[0, 2] * a[2, 0]
+    c12 = a[0, 1] * a[2, 0] - a[0, 0] * a[2, 1]
+    c20 = a[0, 1] * a[1, 2] - a[0, 2] * a[1, 1]
+    c21 = a[0, 2] * a[1, 0] - a[0, 0] * a[1, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.array([c00 * b[0] + c10 * b[1] + c20 * b[2],
+                      c01 * b[0] + c11 * b[1] + c21 * b[2],
+                      c02 * b[0] + c12 * b[1] + c22 * b[2]]) / det
+    m_matrix = np.all(minors > 0, axis=0)
+    return x, m_matrix & np.all(np.isfinite(x), axis=0)
+
+
+def _newton(s, coef, tol, max_iter, safeguard=True):
+    """Function runs Newton's method on a batch of points starting from s.
+
+    With safeguard, s must be a sub-solution, and a fixed-point step is
+    taken at points where the Newton step is not guaranteed to stay below
+    the minimal root, so the iterates increase monotonically to it. Without
+    safeguard, plain Newton steps are taken from approximate solutions s, so
+    the results must be certified as the minimal root before they are used.
+    """
+    n_iter = np.zeros(s.shape[1], dtype=int)
+    active = np.arange(s.shape[1])
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        s_a, coef_a = s[:, active], coef[:, active]
+        res = _residual(s_a, coef_a)
+        step, safe = _solve3(-_jacobian(s_a, coef_a), res)
+        if not safeguard:
+            safe = np.all(np.isfinite(step), axis=0)
+        s_new = np.clip(np.where(safe, s_a + step, s_a + res), 0, 1)
+        # Close to the threshold the Jacobian is nearly singular, so rounding
+        # in a residual of machine size can keep the step above tol
+        done = ((np.max(np.abs(s_new - s_a), axis=0) <= tol) |
+                (np.max(np.abs(res), axis=0) <= _EPS))
+        s[:, active] = s_new
+        n_iter[active] += 1
+        active = active[~done]
+    converged = np.ones(s.shape[1], dtype=bool)
+    converged[active] = False
+    return s, n_iter, converged
+
+
+def _fixed_point(s, coef, tol, max_iter):
+    """Function iterates the offspring generating functions on a batch of
+    points starting from a sub-solution s, which increases monotonically to
+    the minimal root.
+    """
+    n_iter = np.zeros(s.shape[1], dtype=int)
+    active = np.arange(s.shape[1])
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        res = _residual(s[:, active], coef[:, active])
+        s[:, active] = np.clip(s[:, active] + res, 0, 1)
+        n_iter[active] += 1
+        active = active[np.max(np.abs(res), axis=0) > tol]
+    converged = np.ones(s.shape[1], dtype=bool)
+    converged[active] = False
+    return s, n_iter, converged
+
+
+def _anderson(s, coef, tol, max_iter, memory=3):
+    """Function runs Anderson mixing of the offspring generating functions on
+    a batch of points starting from a sub-solution s, using the last memory
+    differences of the iterates. A mixed iterate is accepted where it is a
+    sub-solution at which I - G' is a non-singular M-matrix, which by
+    convexity keeps it below the minimal root, and a Newton step is taken
+    otherwise, so the cost close to the threshold stays bounded.
+    """
+    n_iter = np.zeros(s.shape[1], dtype=int)
+    active = np.arange(s.shape[1])
+    d_res, d_map = [], []
+    res_prev = map_prev = None
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        s_a, coef_a = s[:, active], coef[:, active]
+        res = _residual(s_a, coef_a)
+        map_a = s_a + res
+        if res_prev is not None:
+            d_res = (d_res + [res - res_prev])[-memory:]
+            d_map = (d_map + [map_a - map_prev])[-memory:]
+        s_new = map_a
+        if d_res:
+            # Least squares coefficients of the differences for each point
+            basis = np.array(d_res)
+            gram = np.einsum('kin,lin->nkl', basis, basis)
+            gram += 1e-14 * np.eye(len(d_res)) * (
+                np.trace(gram, axis1=1, axis2=2)[:, np.newaxis, np.newaxis] +
+                np.finfo(float).tiny)
+            gamma = np.linalg.solve(gram, np.einsum('kin,in->nk', basis,
+                                                    res)[:, :, np.newaxis])
+            mixed = np.einsum('kin,nk->in', np.array(d_map), gamma[:, :, 0])
+            candidate = np.clip(map_a - mixed, 0, 1)
+            res_candidate = _residual(candidate, coef_a)
+            _, safe = _solve3(-_jacobian(candidate, coef_a), res_candidate)
+            accept = (safe & np.all(res_candidate >= 0, axis=0) &
+                      np.all(candidate >= s_a, axis=0))
+            s_new = np.where(accept, candidate, s_new)
+        else:
+            accept = np.zeros(active.size, dtype=bool)
+        step, safe = _solve3(-_jacobian(s_a, coef_a), res)
+        s_new = np.clip(np.where(accept | ~safe, s_new, s_a + step), 0, 1)
+        done = ((np.max(np.abs(s_new - s_a), axis=0) <= tol) |
+                (np.max(np.abs(res), axis=0) <= np.finfo(float).eps))
+        s[:, active] = s_new
+        n_iter[active] += 1
+        keep = ~done
+        res_prev, map_prev = res[:, keep], map_a[:, keep]
+        d_res = [d[:, keep] for d in d_res]
+        d_map = [d[:, keep] for d in d_map]
+        active = active[keep]
+    converged = np.ones(s.shape[1], dtype=bool)
+    converged[active] = False
+    return s, n_iter, converged
+
+
+def _reduced_form(x, coef):
+    """Function eliminates z and y from the extinction equations for a given
+    x, taking z as the smaller root of the quadratic eq3 and y from the
+    linear eq2, and returns the residual of eq1 with its derivative in x.
+    """
+    b = 1 - coef[7] * x
+    sqrt_disc = np.sqrt(np.maximum(b**2 - 4 * coef[8] * coef[9], 0))
+    z = 2 * coef[9] / (b + sqrt_disc)
+    e = 1 - coef[4] * x - coef[5] * z
+    y = coef[6] / e
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dz = coef[7] * z / sqrt_disc
+    dy = coef[6] * (coef[4] + coef[5] * dz) / e**2
+    f = coef[0] * x**2 + coef[1] * x * z + coef[2] * y + coef[3] - x
+    df = 2 * coef[0] * x + coef[1] * (z + x * dz) + coef[2] * dy - 1
+    return f, df, y, z
+
+
+def _reduced(coef, tol, max_iter):
+    """Function solves the extinction equations as a scalar equation in x.
+
+    After eliminating y and z, eq1 is convex in x and positive at x = 0, so
+    it is positive exactly below the minimal root. A bracket [lo, hi] on that
+    root is shrunk by Newton steps from lo, which cannot overshoot the root,
+    with bisection whenever the Newton step leaves the bracket.
+    """
+    n = coef.shape[1]
+    lo, hi = np.zeros(n), np.ones(n)
+    f_lo, df_lo, _, _ = _reduced_form(lo, coef)
+    n_iter = np.zeros(n, dtype=int)
+    active = np.arange(n)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        lo_a, hi_a, coef_a = lo[active], hi[active], coef[:, active]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = lo_a - f_lo[active] / df_lo[active]
+        t = np.where(np.isfinite(t) & (t > lo_a) & (t < hi_a), t,
+                     (lo_a + hi_a) / 2)
+        f, df, _, _ = _reduced_form(t, coef_a)
+        above = f > 0
+        lo[active] = np.where(above, t, lo_a)
+        hi[active] = np.where(above, hi_a, t)
+        f_lo[active] = np.where(above, f, f_lo[active])
+        df_lo[active] = np.where(above, df, df_lo[active])
+        n_iter[active] += 1
+        done = ((hi[active] - lo[active] <= tol) | (t - lo_a <= tol) |
+                (np.abs(f) <= np.finfo(float).eps))
+        active = active[~done]
+    converged = np.ones(n, dtype=bool)
+    converged[active] = False
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(df_lo < 0, np.minimum(lo - f_lo / df_lo, hi), lo)
+    _, _, y, z = _reduced_form(x, coef)
+    return np.clip([x, y, z], 0, 1), n_iter, converged
+
+
+def _lm(coef):
+    """Function solves each point separately with the Levenberg-Marquardt
+    method started from (0.5, 0.5, 0.5), using the analytic Jacobian.
+    """
+    from scipy.optimize import root
+
+    s = np.zeros((3, coef.shape[1]))
+    n_iter = np.zeros(coef.shape[1], dtype=int)
+    converged = np.zeros(coef.shape[1], dtype=bool)
+    for k in range(coef.shape[1]):
+        solution = root(_residual, [0.5, 0.5, 0.5], args=(coef[:, k],),
+                        jac=_jacobian, method='lm')
+        s[:, k] = solution.x
+        n_iter[k] = solution.nfev
+        converged[k] = solution.success
+    return np.clip(s, None, 1), n_iter, converged
+
+
+def pmo_batch(r_c, p_b, r_f, r_v, r_w, h, method='auto', tol=1e-12,
+              max_iter=1000, polish=False, skip_subcritical=True, start=None,
+              max_correct=10):
+    """Function calculates the probabilities of a major outbreak for arrays
+    of the variables of the model, solving all points at once.
+
+    The 'newton' and 'fixed_point' methods both start from (0, 0, 0) and
+    increase monotonically to the minimal non-negative root, so they never
+    converge to the trivial root (1, 1, 1) when an outbreak is possible.
+    Fixed-point iteration is cheap far above the threshold and slow close to
+    it, where `polish` finishes the solve with Newton steps. The 'anderson'
+    method accelerates fixed-point iteration by Anderson mixing and falls
+    back to Newton steps where a mixed iterate cannot be certified to stay
+    below the minimal root. The 'reduced' method eliminates y and z in closed
+    form and solves a bracketed scalar equation in x, which is the cheapest.
+    The 'lm' method solves each point separately as `root` did before. The
+    'numba' method runs Newton's method for each point in a compiled kernel
+    from `kernels`, and falls back to the 'newton' method when Numba is not
+    installed.
+
+    Every point is checked to be the minimal root, and is only counted as
+    converged if it is. The 'auto' method tries the methods of `LADDER` in
+    turn on the points the previous ones did not solve, and raises a
+    `ConvergenceError` if any point is left. Subcritical points, where the
+    minimal root is (1, 1, 1), are found from the mean offspring matrix and
+    skipped unless skip_subcritical is False.
+
+    Given start, such as the solutions at nearby points, each point is first
+    corrected from it by up to max_correct plain Newton steps, and only
+    solved by method if the result is not certified as the minimal root.
+
+    Parameters
+    ----------
+    r_c : float or np.array
+        Average expected number of infections within the community
+    p_b : float or np.array
+        Probability of an unsafe burial
+    r_f : float or np.array
+        Average expected number of infections from an unsafe burial
+    r_v : float or np.array
+        Average expected number of infections of healthcare facility visitors
+    r_w : float or np.array
+        Average expected number of infections of healthcare workers
+    h : float or np.array
+        Probability of hospitalisation
+    method : str
+        Solver used, one of 'auto', 'newton', 'fixed_point', 'anderson',
+        'reduced', 'lm' or 'numba'
+    tol : float
+        Tolerance on the size of the step at which a point has converged
+    max_iter : int
+        Maximum number of iterations
+    polish : bool
+        Whether to finish the 'fixed_point' method with Newton steps
+    skip_subcritical : bool
+        Whether to set the probabilities at subcritical points to 0 without
+        solving
+    start : np.array
+        Array of shape (3, ...) of approximate solutions (q_c, q_f, q_h) that
+        broadcasts against the variables, or None to solve every point with
+        method
+    max_correct : int
+        Maximum number of Newton steps from start
+
+    Returns
+    -------
+    Solution
+        Solution with arrays of the broadcast shape of the variables, where
+        n_iter counts function evaluations for the 'lm' method, the mean of
+        skipped is the fraction of points that were not solved and residual
+        measures how well each point was solved
+
+    Raises
+    ------
+    ConvergenceError
+        If the 'auto' method leaves points that no method solved
+    """
+    params = np.broadcast_arrays(r_c, p_b, r_f, r_v, r_w, h)
+    shape = params[0].shape
+    coef = _coefficients(*[np.ravel(v) for v in params])
+    if skip_subcritical:
+        skipped = _subcritical(coef)
+    else:
+        skipped = np.zeros(coef.shape[1], dtype=bool)
+    s = np.ones((3, coef.shape[1]))
+    n_iter = np.zeros(coef.shape[1], dtype=int)
+    converged = skipped.copy()
+    used = np.where(skipped, 'skipped', 'failed').astype('<U11')
+    batch = Telemetry()
+    batch.record('skipped', int(skipped.sum()), int(skipped.sum()), 0, 0.0)
+    todo = np.flatnonzero(~skipped)
+    if start is not None:
+        clock = time.perf_counter()
+        start = np.broadcast_to(start, (3,) + shape).reshape(3, -1)
+        s_warm, n_warm, converged_warm = _newton(
+            start[:, todo].astype(float), coef[:, todo], tol, max_correct,
+            safeguard=False)
+        solved = converged_warm & _certified(s_warm, coef[:, todo])
+        batch.record('start', todo.size, int(solved.sum()),
+                     int(n_warm.sum()), time.perf_counter() - clock)
+        s[:, todo[solved]] = s_warm[:, solved]
+        n_iter[todo] += n_warm
+        converged[todo[solved]] = True
+        used[todo[solved]] = 'start'
+        todo = todo[~solved]
+    for rung in LADDER if method == 'auto' else (method,):
+        if todo.size == 0 and (method == 'auto' or start is not None):
+            break
+        clock = time.perf_counter()
+        s_rung, n_rung, converged_rung = _solve_batch(
+            coef[:, todo], rung, tol, max_iter, polish)
+        solved = converged_rung & _certified(s_rung, coef[:, todo])
+        batch.record(rung, todo.size, int(solved.sum()), int(n_rung.sum()),
+                     time.perf_counter() - clock)
+        s[:, todo] = s_rung
+        n_iter[todo] += n_rung
+        converged[todo[solved]] = True
+        used[todo[solved]] = rung
+        todo = todo[~solved]
+    batch.failures = todo.size
+    telemetry.merge(batch)
+    if method == 'auto' and todo.size:
+        raise ConvergenceError(
+            '{} of {} points were not solved, the first at (r_c, p_b, r_f, '
+            'r_v, r_w, h) = {}'.format(todo.size, coef.shape[1], tuple(
+                float(np.ravel(v)[todo[0]]) for v in params)))
+    residual = np.max(np.abs(_residual(s, coef)), axis=0)
+    return Solution(*s.reshape((3,) + shape), n_iter=n_iter.reshape(shape),
+                    converged=converged.reshape(shape),
+                    skipped=skipped.reshape(shape),
+                    residual=residual.reshape(shape),
+                    method=used.reshape(shape), telemetry=batch)
+
+
+def _solve_batch(coef, method, tol, max_iter, polish):
+    """Function solves a batch of points with the method of `pmo_batch`,
+    returning the solutions, the numbers of iterations and whether each
+    point converged.
+    """
+    s = np.zeros((3, coef.shape[1]))
+    if method == 'newton':
+        s, n_iter, converged = _newton(s, coef, tol, max_iter)
+    elif method == 'fixed_point':
+        s, n_iter, converged = _fixed_point(s, coef, tol, max_iter)
+        if polish:
+            s, n_polish, converged = _newton(s, coef, tol, max_iter)
+            n_iter += n_polish
+    elif method == 'anderson':
+        s, n_iter, converged = _anderson(s, coef, tol, max_iter)
+    elif method == 'reduced':
+        s, n_iter, converged = _reduced(coef, tol, max_iter)
+    elif method == 'lm':
+        s, n_iter, converged = _lm(coef)
+    elif method == 'numba':
+        from ebola_model.functions.kernels import newton_batch
+        s, n_iter, converged = newton_batch(coef, tol, max_iter)
+    else:
+        raise ValueError("Unknown method '{}'".format(method))
+    return s, n_iter, converged
+
+
+def _newton_point(x, y, z, c, tol, max_iter, safeguard):
+    """Function runs Newton's method for a single point with the
+    coefficients c, in plain floats to avoid array overhead.
+
+    With safeguard, a fixed-point step is taken wherever the Newton step is
+    not guaranteed to be monotone, as in `_newton`. The returned flag is True
+    when I - G'(s) is a non-singular M-matrix at the final point, which by
+    convexity of the generating functions certifies the minimal root.
+    """
+    eps = _EPS
+    n_iter = 0
+    converged = minimal = False
+    while n_iter < max_iter:
+        r0 = c[0]*x*x + c[1]*x*z + c[2]*y + c[3] - x
+        r1 = c[4]*x*y + c[5]*y*z + c[6] - y
+        r2 = c[7]*x*z + c[8]*z*z + c[9] - z
+        a00 = 1 - 2*c[0]*x - c[1]*z
+        a01, a02 = -c[2], -c[1]*x
+        a10, a11, a12 = -c[4]*y, 1 - c[4]*x - c[5]*z, -c[5]*y
+        a20, a22 = -c[7]*z, 1 - c[7]*x - 2*c[8]*z
+        c00, c01, c02 = a11*a22, a12*a20 - a10*a22, -a11*a20
+        c22 = a00*a11 - a01*a10
+        det = a00*c00 + a01*c01 + a02*c02
+        minimal = a00 > 0 and c22 > 0 and det > 0
+        n_iter += 1
+        if det != 0 and (minimal or not safeguard):
+            d0 = (c00*r0 - a01*a22*r1 + (a01*a12 - a02*a11)*r2) / det
+            d1 = (c01*r0 + (a00*a22 - a02*a20)*r1 + (a02*a10 - a00*a12)*r2)\
+                / det
+            d2 = (c02*r0 + a01*a20*r1 + c22*r2) / det
+        else:
+            d0, d1, d2 = r0, r1, r2
+        x_new = min(max(x + d0, 0.0), 1.0)
+        y_new = min(max(y + d1, 0.0), 1.0)
+        z_new = min(max(z + d2, 0.0), 1.0)
+        step = max(abs(x_new - x), abs(y_new - y), abs(z_new - z))
+        x, y, z = x_new, y_new, z_new
+        if step != step:
+            break
+        if step <= tol or max(abs(r0), abs(r1), abs(r2)) <= eps:
+            converged = True
+            break
+    return x, y, z, n_iter, converged, minimal
+
+
+def pmo_sweep(r_c, p_b, r_f, r_v, r_w, h, tol=1e-12, max_iter=100,
+              max_correct=10, skip_subcritical=True):
+    """Function calculates the probabilities of a major outbreak along an
+    ordered path of variables by continuation.
+
+    The points are visited in row-major order. Each solve is seeded with a
+    linear extrapolation of the previous two solutions along the last axis
+    that moved, and corrected with Newton's method. A corrected point is only
+    kept if the Jacobian there certifies the minimal root, otherwise it is
+    solved again from (0, 0, 0). On smooth sweeps and grids this needs one or
+    two Newton steps per point. Every point is then checked as in
+    `pmo_batch`, and points that are not certified as the minimal root are
+    solved again by `pmo_batch` with the 'auto' method.
+
+    Parameters
+    ----------
+    r_c : float or np.array
+        Average expected number of infections within the community
+    p_b : float or np.array
+        Probability of an unsafe burial
+    r_f : float or np.array
+        Average expected number of infections from an unsafe burial
+    r_v : float or np.array
+        Average expected number of infections of healthcare facility visitors
+    r_w : float or np.array
+        Average expected number of infections of healthcare workers
+    h : float or np.array
+        Probability of hospitalisation
+    tol : float
+        Tolerance on the size of the step at which a point has converged
+    max_iter : int
+        Maximum number of iterations of a solve from (0, 0, 0)
+    max_correct : int
+        Maximum number of corrector iterations before a point is solved
+        again from (0, 0, 0)
+    skip_subcritical : bool
+        Whether to set the probabilities at subcritical points to 0 without
+        solving
+
+    Returns
+    -------
+    Solution
+        Solution with arrays of the broadcast shape of the variables, as
+        returned by `pmo_batch`, where points solved here have the method
+        'sweep' and n_iter counts the Newton iterations spent on each point
+
+    Raises
+    ------
+    ConvergenceError
+        If points are left that no method solved
+    """
+    params = np.broadcast_arrays(r_c, p_b, r_f, r_v, r_w, h)
+    shape = params[0].shape
+    theta = np.array([np.ravel(v) for v in params], dtype=float)
+    coef = _coefficients(*theta)
+    if skip_subcritical:
+        skipped = _subcritical(coef)
+    else:
+        skipped = np.zeros(coef.shape[1], dtype=bool)
+    coef_points = coef.T.tolist()
+    theta_points = theta.T.tolist()
+    strides = [int(np.prod(shape[k + 1:])) for k in range(len(shape))]
+    s = [(1.0, 1.0, 1.0)] * len(theta_points)
+    n_iter = np.zeros(len(theta_points), dtype=int)
+    converged = skipped.copy()
+    clock = time.perf_counter()
+    for k, idx in enumerate(np.ndindex(*shape)):
+        if skipped[k]:
+            continue
+        moved = [a for a in range(len(shape)) if idx[a] > 0]
+        correct = False
+        if moved:
+            prev = k - strides[moved[-1]]
+            x, y, z = s[prev]
+            if idx[moved[-1]] > 1:
+                prev_2 = prev - strides[moved[-1]]
+                d_0 = math.dist(theta_points[prev], theta_points[prev_2])
+                if d_0 > 0:
+                    ratio = (math.dist(theta_points[k], theta_points[prev])
+                             / d_0)
+                    x, y, z = [min(max(a + ratio * (a - b), 0.0), 1.0)
+                               for a, b in zip(s[prev], s[prev_2])]
+            x, y, z, n_iter[k], correct, minimal = _newton_point(
+                x, y, z, coef_points[k], tol, max_correct, False)
+            correct = correct and minimal
+        if correct:
+            converged[k] = True
+        else:
+            x, y, z, n_cold, converged[k], _ = _newton_point(
+                0.0, 0.0, 0.0, coef_points[k], tol, max_iter, True)
+            n_iter[k] += n_cold
+        s[k] = x, y, z
+    s = np.array(s).T
+    solved = ~skipped
+    converged[solved] &= _certified(s[:, solved], coef[:, solved])
+    used = np.where(skipped, 'skipped', 'sweep').astype('<U11')
+    batch = Telemetry()
+    batch.record('skipped', int(skipped.sum()), int(skipped.sum()), 0, 0.0)
+    batch.record('sweep', int(solved.sum()),
+                 int(converged.sum() - skipped.sum()), int(n_iter.sum()),
+                 time.perf_counter() - clock)
+    telemetry.merge(batch)
+    todo = np.flatnonzero(~converged)
+    if todo.size:
+        solution = pmo_batch(*theta[:, todo], method='auto', tol=tol,
+                             skip_subcritical=False)
+        batch.merge(solution.telemetry)
+        s[:, todo] = solution.q_c, solution.q_f, solution.q_h
+        n_iter[todo] += solution.n_iter
+        converged[todo] = True
+        used[todo] = solution.method
+    residual = np.max(np.abs(_residual(s, coef)), axis=0)
+    return Solution(*s.reshape((3,) + shape), n_iter=n_iter.reshape(shape),
+                    converged=converged.reshape(shape),
+                    skipped=skipped.reshape(shape),
+                    residual=residual.reshape(shape),
+                    method=used.reshape(shape), telemetry=batch)
+
+
+def _parameter_jacobian(s, r_c, p_b, r_f, r_v, r_w, h):
+    """Function calculates the Jacobian of `residual` with respect to the
+    variables (r_c, p_b, r_f, r_v, r_w, h), as an array of shape (3, 6, ...).
+    """
+    x, y, z = s
+    r_c, p_b, r_f, r_v, r_w, h = np.broadcast_arrays(r_c, p_b, r_f, r_v,
+                                                     r_w, h)
+    d = r_v + r_w + 1
+    eq3 = ((1 - h) * x * z + h * z**2 - 1) / d**2
+    jac = np.zeros((3, 6) + np.shape(x))
+    jac[0, 0] = ((1 - h) * x**2 + h * x * z - p_b * y - (1 - p_b)) \
+        / (r_c + 1)**2
+    jac[0, 1] = (y - 1) / (r_c + 1)
+    jac[0, 5] = r_c * x * (z - x) / (r_c + 1)
+    jac[1, 2] = ((1 - h) * x * y + h * y * z - 1) / (r_f + 1)**2
+    jac[1, 5] = r_f * y * (z - x) / (r_f + 1)
+    jac[2, 3] = eq3 * (r_w + 1) - (z**2 - 1) * r_w / d**2
+    jac[2, 4] = (z**2 - 1) * (r_v + 1) / d**2 - eq3 * r_v
+    jac[2, 5] = r_v * z * (z - x) / d
+    return jac
+
+
+def pmo_sensitivity(r_c, p_b, r_f, r_v, r_w, h, method='auto'):
+    """Function calculates the probabilities of a major outbreak and their
+    derivatives with respect to the variables of the model. The derivatives
+    follow from the implicit function theorem, solving
+    (I - G'(s)) ds = dG at the minimal root s, so they cost one 3x3 linear
+    solve per point on top of the solve for s.
+
+    Parameters
+    ----------
+    r_c, p_b, r_f, r_v, r_w, h : float or np.array
+        Variables of the model, as in `pmo_batch`
+    method : str
+        Solver used by `pmo_batch`
+
+    Returns
+    -------
+    tuple[Solution, np.array, np.array]
+        Solution and the derivatives of p_c and p_h with respect to
+        (r_c, p_b, r_f, r_v, r_w, h), as arrays of shape (6, ...) that are
+        not finite where the minimal root is critical
+    """
+    solution = pmo_batch(r_c, p_b, r_f, r_v, r_w, h, method=method)
+    s = np.array([solution.q_c, solution.q_f, solution.q_h])
+    ds = tangent(s, r_c, p_b, r_f, r_v, r_w, h)
+    return solution, -ds[0], -ds[2]
+
+
+def tangent(s, r_c, p_b, r_f, r_v, r_w, h, direction=None):
+    """Function calculates the derivatives of a root s of the extinction
+    equations with respect to the variables of the model, by the implicit
+    function theorem.
+
+    Parameters
+    ----------
+    s : np.array
+        Array of shape (3,) or (3, ...) of roots (q_c, q_f, q_h)
+    r_c, p_b, r_f, r_v, r_w, h : float or np.array
+        Variables of the model, as in `residual`
+    direction : np.array
+        Array of shape (6, ...) of changes in (r_c, p_b, r_f, r_v, r_w, h),
+        or None for the derivatives with respect to each variable
+
+    Returns
+    -------
+    np.array
+        Derivatives of shape (3, 6, ...), where the first axis indexes
+        (q_c, q_f, q_h) and the second (r_c, p_b, r_f, r_v, r_w, h), or of
+        shape (3, ...) along direction if it is given
+    """
+    a = -_jacobian(s, _coefficients(r_c, p_b, r_f, r_v, r_w, h))
+    b = _parameter_jacobian(s, r_c, p_b, r_f, r_v, r_w, h)
+    if direction is not None:
+        ds, _ = _solve3(a, np.einsum('ij...,j...->i...', b, direction))
+        return ds
+    ds, _ = _solve3(a[:, :, np.newaxis], b)
+    return ds
@@ -1,33 +1,183 @@
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 
-from SALib.analyze.sobol import analyze
-from SALib.sample.sobol import sample
 from ebola_model.functions import gsa
 
-def finding_indices():
-    """Function to find the first-order and total-order sensitivity indices of
-    the model and to plot the results.
+def _problem():
+    """Function returns the problem of the global sensitivity analysis over
+    the variables of the model and the probability of hospitalisation.
+    """
+    return {'num_vars': 5,
+            'names': [r'$R_C$', r'$p_f$', r'$R_V$', r'$R_W$', r'$p_h$'],
+            'bounds': [[0, 56/27], [0, 1], [0, 0.5], [0, 1.6*28/27], [0, 1]]}
+
+def _h_problem():
+    """Function returns the problem of the global sensitivity analysis over
+    the variables of the model for a fixed probability of hospitalisation.
+    """
+    return {'num_vars': 4,
+            'names': [r'$R_C$', r'$p_f$', r'$R_V$', r'$R_W$'],
+            'bounds': [[0, 56/27], [0, 1], [0, 0.5], [0, 1.6*28/27]]}
+
+def _progressive(problem, evaluate, conf, N, N_max, seed):
+    """Function calculates the sensitivity indices of one or more outputs of
+    a model from Saltelli samples of increasing size. The number of base
+    samples starts at N and is doubled, by sampling the next points of the
+    same scrambled Sobol' sequence and evaluating only those, until the
+    confidence intervals of every index are no wider than conf on either
+    side or N_max base samples are used.
+
+    Parameters
+    ----------
+    problem : dict
+        Problem analysed
+    evaluate : function
+        Function returning the outputs, with shape (n_outputs, n_samples),
+        for a Saltelli design
+    conf : float
+        Largest half-width allowed for the 95% confidence intervals
+    N : int
+        Initial number of base samples, a power of 2
+    N_max : int
+        Largest number of base samples
+    seed : int
+        Seed of the scrambling of the sequence and of the bootstrap
+
+    Returns
+    -------
+    tuple[list, int]
+        Sensitivity indices returned by `analyze` for each output and the
+        number of model evaluations used
+    """
+    from SALib.analyze.sobol import analyze
+    from SALib.sample.sobol import sample
+
+    if N < 2 or N & (N - 1):
+        raise ValueError('N must be a power of 2 greater than 1')
+    if seed is None:
+        seed = int(np.random.default_rng().integers(2**31))
+    Y = []
+    n = 0
+    while True:
+        param_values = sample(problem, N - n, calc_second_order=False,
+                              skip_values=n, seed=seed)
+        Y.append(np.atleast_2d(evaluate(param_values)))
+        n = N
+        Si = [analyze(problem, Y_i, calc_second_order=False,
+                      print_to_console=False, seed=seed)
+              for Y_i in np.concatenate(Y, axis=1)]
+        width = max(max(np.nanmax(S['S1_conf']), np.nanmax(S['ST_conf']))
+                    for S in Si)
+        if width <= conf or 2*N > N_max:
+            return Si, sum(Y_i.shape[1] for Y_i in Y)
+        N *= 2
+
+def _tables(names, Si):
+    """Function collects the first-order and total-order indices in the
+    results Si of `analyze` into two tables, with one row for each result
+    and one column for each of names.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame([S['S1'] for S in Si], columns=names)
+    st = pd.DataFrame([S['ST'] for S in Si], columns=names)
+    return df, st
+
+def sobol_indices(N=65536, outputs=None):
+    """Function calculates the first-order and total-order sensitivity indices
+    of the probability of a major outbreak to the variables of the model.
+
+    Parameters
+    ----------
+    N : int
+        Number of base samples of the Sobol' sequence
+    outputs : tuple[str]
+        Outputs from `gsa.OUTPUTS` analysed from the same solves, or None
+        for the probability of a major outbreak starting in the community
+        only
+
+    Returns
+    -------
+    tuple[dict, dict]
+        Problem analysed and the sensitivity indices returned by `analyze`,
+        or a dict of them keyed by output if outputs are given
     """
+    from SALib.analyze.sobol import analyze
+    from SALib.sample.sobol import sample
+
     # Define model parameters
-    problem = {'num_vars': 5,
-               'names': [r'$R_C$', r'$p_f$', r'$R_V$', r'$R_W$', r'$p_h$'],
-               'bounds': [[0, 56/27], [0, 1], [0, 0.5], [0, 1.6*28/27], [0, 1]]}
+    problem = _problem()
 
     # Generate samples
-    param_values = sample(problem, 65536, calc_second_order=False)
+    param_values = sample(problem, N, calc_second_order=False)
 
     # Run the model
     m = gsa.Model()
-    Y = m.evaluate(X=param_values)
+    Y = m.evaluate(X=param_values, saltelli=True, outputs=outputs)
 
     # Perform analysis
-    Si = analyze(problem, Y, calc_second_order=False, print_to_console=False)
+    if outputs is None:
+        Si = analyze(problem, Y, calc_second_order=False,
+                     print_to_console=False)
+    else:
+        Si = {name: analyze(problem, Y_k, calc_second_order=False,
+                            print_to_console=False)
+              for name, Y_k in zip(outputs, Y)}
+    return problem, Si
+
+def progressive_indices(conf=0.01, N=1024, N_max=65536, seed=None,
+                        n_workers=1, outputs=None):
+    """Function calculates the first-order and total-order sensitivity indices
+    of the probability of a major outbreak to the variables of the model,
+    doubling the number of base samples from N until the half-widths of the
+    95% confidence intervals of every index are at most conf. Earlier model
+    evaluations are reused each time the sample grows.
+
+    Parameters
+    ----------
+    conf : float
+        Largest half-width allowed for the confidence intervals
+    N : int
+        Initial number of base samples of the Sobol' sequence, a power of 2
+    N_max : int
+        Largest number of base samples
+    seed : int
+        Seed of the scrambling of the sequence and of the bootstrap,
+        drawn at random if None
+    n_workers : int
+        Number of processes the model is solved on, or None to use every
+        core
+    outputs : tuple[str]
+        Outputs from `gsa.OUTPUTS` analysed from the same solves, or None
+        for the probability of a major outbreak starting in the community
+        only
+
+    Returns
+    -------
+    tuple[dict, dict, int]
+        Problem analysed, the sensitivity indices returned by `analyze`, or
+        a dict of them keyed by output if outputs are given, and the number
+        of model evaluations used
+    """
+    problem = _problem()
+    names = outputs or ('p_c',)
+    m = gsa.Model()
+    Si, n_evaluations = _progressive(
+        problem, lambda X: m.evaluate(X=X, saltelli=True, n_workers=n_workers,
+                                      outputs=names),
+        conf, N, N_max, seed)
+    if outputs is None:
+        return problem, Si[0], n_evaluations
+    return problem, dict(zip(outputs, Si)), n_evaluations
+
+def plot_indices(names, S1, ST):
+    """Function plots the first-order and total-order sensitivity indices
+    returned by `sobol_indices`.
+    """
+    import matplotlib.pyplot as plt
 
     # Plot the sensitivity indices with error bars
     plt.figure(figsize = [8, 6])
-    plt.bar(problem['names'], Si['S1'])
+    plt.bar(names, S1)
     plt.ylabel('First-order Sobol\' indices', fontsize=20, labelpad=10)
     plt.xlabel(r'Parameter ($\it{x}$)', fontsize=20, labelpad=10)
     plt.tick_params(labelsize=18, axis='both')
@@ -38,10 +188,9 @@ def finding_indices():
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     plt.tight_layout()
-    plt.show()
 
     plt.figure(figsize = [8, 6])
-    plt.bar(problem['names'], Si['ST'])
+    plt.bar(names, ST)
     plt.ylabel('Total-order Sobol\' indices', fontsize=20, labelpad=10)
     plt.xlabel(r'Parameter ($\it{x}$)', fontsize=20, labelpad=10)
     plt.tick_params(labelsize=18, axis='both')
@@ -52,34 +201,138 @@ def finding_indices():
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     plt.tight_layout()
+
+def finding_indices(conf=None):
+    """Function to find the first-order and total-order sensitivity indices of
+    the model and to plot the results. If conf is given, the indices are
+    found with `progressive_indices` to that accuracy, and the number of
+    model evaluations used is returned, otherwise None is.
+    """
+    import matplotlib.pyplot as plt
+
+    n_evaluations = None
+    if conf is None:
+        problem, Si = sobol_indices()
+    else:
+        problem, Si, n_evaluations = progressive_indices(conf)
+    plot_indices(problem['names'], Si['S1'], Si['ST'])
     plt.show()
+    return n_evaluations
 
-def varying_h():
-    """Function to vary the probability of treatment in a healthcare facility
-    and to find the first-order and total-order sensitivity indices of the
-    model for each value of h. The results are then plotted.
+def h_indices(N=8192, h=None, n_workers=1, outputs=None):
+    """Function calculates the first-order and total-order sensitivity indices
+    of the model for each value of the probability of treatment in a
+    healthcare facility.
+
+    Parameters
+    ----------
+    N : int
+        Number of base samples of the Sobol' sequence
+    h : np.array
+        Probabilities of treatment in a healthcare facility, defaulting to
+        22 values from 0 to 1
+    n_workers : int
+        Number of processes the model is solved on, or None to use every
+        core
+    outputs : tuple[str]
+        Outputs from `gsa.OUTPUTS` analysed from the same solves, or None
+        for the probability of a major outbreak starting in the community
+        only
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame]
+        First-order and total-order indices, with one row for each value of
+        h and one column for each variable, or dicts of them keyed by
+        output if outputs are given
     """
-    problem = {'num_vars': 4,
-               'names': [r'$R_C$', r'$p_f$', r'$R_V$', r'$R_W$'],
-               'bounds': [[0, 56/27], [0, 1], [0, 0.5], [0, 1.6*28/27]]}
+    from SALib.analyze.sobol import analyze
+    from SALib.sample.sobol import sample
+
+    problem = _h_problem()
 
     # # Generate samples
-    param_values = sample(problem, 8192, calc_second_order=False)
+    param_values = sample(problem, N, calc_second_order=False)
 
     # Run the model
-    h = np.linspace(0, 1, 22)
-    df = pd.DataFrame() # Dataframe to store first-order indices
-    st = pd.DataFrame() # Dataframe to store total-order indices
-    for i in range(len(h)):
-        m = gsa.Model()
-        Y = m.evaluate_h(h[i], X=param_values)
-        Si = analyze(problem, Y, calc_second_order=False,
-                     print_to_console=False)
-        # Update the dataframe for each loop
-        df = pd.concat([df, pd.DataFrame([Si['S1']],
-                                         columns=problem['names'])], axis=0)
-        st = pd.concat([st, pd.DataFrame([Si['ST']],
-                                         columns=problem['names'])], axis=0)
+    if h is None:
+        h = np.linspace(0, 1, 22)
+    names = outputs or ('p_c',)
+    m = gsa.Model()
+    Y = m.evaluate_h(h, X=param_values, saltelli=True, n_workers=n_workers,
+                     outputs=names)
+
+    # Perform the analysis for each output and value of h
+    tables = [_tables(problem['names'],
+                      [analyze(problem, Y_h, calc_second_order=False,
+                               print_to_console=False) for Y_h in Y_k])
+              for Y_k in Y]
+    if outputs is None:
+        return tables[0]
+    return ({name: df for name, (df, st) in zip(outputs, tables)},
+            {name: st for name, (df, st) in zip(outputs, tables)})
+
+def progressive_h_indices(conf=0.01, N=1024, N_max=65536, h=None, seed=None,
+                          n_workers=1, outputs=None):
+    """Function calculates the first-order and total-order sensitivity indices
+    of the model for each value of the probability of treatment in a
+    healthcare facility, doubling the number of base samples from N until
+    the half-widths of the 95% confidence intervals of every index, for
+    every value of h, are at most conf.
+
+    Parameters
+    ----------
+    conf : float
+        Largest half-width allowed for the confidence intervals
+    N : int
+        Initial number of base samples of the Sobol' sequence, a power of 2
+    N_max : int
+        Largest number of base samples
+    h : np.array
+        Probabilities of treatment in a healthcare facility, defaulting to
+        22 values from 0 to 1
+    seed : int
+        Seed of the scrambling of the sequence and of the bootstrap,
+        drawn at random if None
+    n_workers : int
+        Number of processes the model is solved on, or None to use every
+        core
+    outputs : tuple[str]
+        Outputs from `gsa.OUTPUTS` analysed from the same solves, or None
+        for the probability of a major outbreak starting in the community
+        only
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame, int]
+        First-order and total-order indices, with one row for each value of
+        h and one column for each variable, or dicts of them keyed by
+        output if outputs are given, and the number of model evaluations
+        used
+    """
+    problem = _h_problem()
+    if h is None:
+        h = np.linspace(0, 1, 22)
+    names = outputs or ('p_c',)
+    m = gsa.Model()
+    Si, n_evaluations = _progressive(
+        problem, lambda X: m.evaluate_h(h, X=X, saltelli=True,
+                                        n_workers=n_workers,
+                                        outputs=names).reshape(-1, len(X)),
+        conf, N, N_max, seed)
+    tables = [_tables(problem['names'], Si[k*len(h):(k + 1)*len(h)])
+              for k in range(len(names))]
+    if outputs is None:
+        return tables[0] + (n_evaluations,)
+    return ({name: df for name, (df, st) in zip(outputs, tables)},
+            {name: st for name, (df, st) in zip(outputs, tables)},
+            n_evaluations)
+
+def plot_h_indices(h, df, st):
+    """Function plots the sensitivity indices returned by `h_indices` against
+    the probability of treatment in a healthcare facility.
+    """
+    import matplotlib.pyplot as plt
 
     # Plot the sensitivity indices against h
     plt.figure(figsize = [8, 6])
@@ -101,7 +354,6 @@ def varying_h():
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     plt.tight_layout()
-    plt.show()
 
     plt.figure(figsize = [8, 6])
     plt.plot(h, st['$R_C$'], marker='o', label=r'$R_C$')
@@ -122,4 +374,24 @@ def varying_h():
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     plt.tight_layout()
+
+
+def varying_h(conf=None):
+    """Function to vary the probability of treatment in a healthcare facility
+    and to find the first-order and total-order sensitivity indices of the
+    model for each value of h. The results are then plotted. If conf is
+    given, the indices are found with `progressive_h_indices` to that
+    accuracy, and the number of model evaluations used is returned,
+    otherwise None is.
+    """
+    import matplotlib.pyplot as plt
+
+    h = np.linspace(0, 1, 22)
+    n_evaluations = None
+    if conf is None:
+        df, st = h_indices(h=h)
+    else:
+        df, st, n_evaluations = progressive_h_indices(conf, h=h)
+    plot_h_indices(h, df, st)
     plt.show()
+    return n_evaluations
@@ -0,0 +1,122 @@
+#
+# Tests the caches of model results
+#
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from ebola_model.functions import cache as c
+from ebola_model.functions.cache import DiskCache, LRUCache
+from ebola_model.functions.intervention_combinations import Combination
+from ebola_model.functions.probability import PMO
+
+
+class TestLRUCache(unittest.TestCase):
+    """
+    Tests the in-memory cache and the memoization of `PMO.pmo`.
+    """
+    def test_eviction(self):
+        # The least recently used entry is evicted, and lookups count
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.info(), {'hits': 3, 'misses': 1,
+                                        'maxsize': 2, 'currsize': 2})
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits + cache.misses, 0)
+
+    def test_pmo(self):
+        # Repeated and rounded-equal parameter sets are served from cache
+        model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+        variables = model.variables()
+        expected = model.pmo(*variables, 0.6)
+        cache = model.enable_cache(maxsize=8, decimals=6)
+        first = model.pmo(*variables, 0.6)
+        self.assertEqual(model.pmo(*variables, 0.6), first)
+        self.assertEqual(model.pmo(*variables, 0.6 + 1e-9), first)
+        self.assertAlmostEqual(first[0], expected[0], places=5)
+        self.assertAlmostEqual(first[1], expected[1], places=5)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        model.disable_cache()
+        self.assertIsNone(model.cache)
+        self.assertEqual(model.pmo(*variables, 0.6), expected)
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Tests the on-disk cache and its invalidation.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        # A stored computation is loaded instead of recomputed
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return np.arange(6.0).reshape(2, 3), np.array([True, False])
+
+        inputs = {'h': 0.6, 'axes': {'r_w': np.linspace(0, 1, 3)}}
+        first = self.cache.cached('test', inputs, compute)
+        second = self.cache.cached('test', inputs, compute)
+        self.assertEqual(len(calls), 1)
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a, b)
+            self.assertEqual(a.dtype, b.dtype)
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+    def test_key(self):
+        # Keys change with the name, values, dtypes and shapes of inputs
+        inputs = {'h': 0.6, 'axes': {'r_w': np.linspace(0, 1, 3)}}
+        key = self.cache.key('test', inputs)
+        self.assertEqual(key, self.cache.key('test', dict(inputs)))
+        for name, other in (
+                ('other', inputs),
+                ('test', {'h': 0.7, 'axes': inputs['axes']}),
+                ('test', {'h': 0.6, 'axes': {'r_w': np.linspace(0, 1, 4)}}),
+                ('test', {'h': 0.6, 'axes': {
+                    'r_w': np.linspace(0, 1, 3, dtype=np.float32)}}),
+                ('test', {'h': 0.6, 'axes': {'r_v': np.linspace(0, 1, 3)}})):
+            self.assertNotEqual(key, self.cache.key(name, other))
+
+    def test_sources(self):
+        # Entries stored under other solver code miss
+        inputs = {'h': 0.6}
+        key = self.cache.key('test', inputs)
+        sources = c.SOURCES
+        try:
+            c.SOURCES = sources[:-1]
+            c.source_digest.cache_clear()
+            self.assertNotEqual(key, self.cache.key('test', inputs))
+        finally:
+            c.SOURCES = sources
+            c.source_digest.cache_clear()
+        self.assertEqual(key, self.cache.key('test', inputs))
+
+    def test_sweep(self):
+        # Cached sweeps match fresh ones
+        model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+        axes = {'p_f': np.linspace(0, 1, 5), 'r_w': np.linspace(0, 3, 7)}
+        fresh = Combination.sweep(model, axes)
+        stored = Combination.sweep(model, axes, cache=self.cache)
+        loaded = Combination.sweep(model, axes, cache=self.cache)
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+        for a, b, d in zip(fresh, stored, loaded):
+            np.testing.assert_array_equal(a, b)
+            np.testing.assert_array_equal(a, d)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#
+# Tests the grids of intervention combinations
+#
+import unittest
+import numpy as np
+
+from ebola_model.functions.intervention_combinations import Combination
+from ebola_model.functions.probability import PMO
+
+
+class TestAdaptive(unittest.TestCase):
+    """
+    Tests adaptive refinement against a dense sweep of the same grid.
+    """
+    def test_adaptive(self):
+        # Samples are exact, interpolated points are within tol, and fewer
+        # points are solved than on the dense grid
+        model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+        p_c, p_h, grid_axes, samples = Combination.adaptive(
+            model, {'p_f': (0, 1), 'r_w': (0, 3)}, n_coarse=9, depth=3,
+            tol=0.02, levels=[0.5])
+        self.assertEqual(p_c.shape, (65, 65))
+        dense_c, dense_h = Combination.sweep(
+            model, dict(zip(('p_f', 'r_w'), grid_axes)))
+        i = np.searchsorted(grid_axes[0], samples[:, 0])
+        j = np.searchsorted(grid_axes[1], samples[:, 1])
+        np.testing.assert_allclose(samples[:, 2], dense_c[i, j], rtol=0,
+                                   atol=1e-12)
+        np.testing.assert_allclose(samples[:, 3], dense_h[i, j], rtol=0,
+                                   atol=1e-12)
+        np.testing.assert_allclose(p_c, dense_c, rtol=0, atol=0.02)
+        np.testing.assert_allclose(p_h, dense_h, rtol=0, atol=0.02)
+        self.assertLess(len(samples), p_c.size)
+
+
+class TestContour(unittest.TestCase):
+    """
+    Tests contour tracing by solving the model on the traced points.
+    """
+    def test_contour(self):
+        # Traced points are on the level, for both outputs
+        model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+        axes = {'r_w': (0, 3), 'p_f': (0, 1)}
+        for output, k in (('p_c', 0), ('p_h', 1)):
+            lines = Combination.contour(model, 0.5, axes, output=output,
+                                        n_trace=40)
+            self.assertTrue(lines, output)
+            for line in lines:
+                self.assertTrue(np.all(np.diff(line[:, 1]) > 0))
+                for u, v in line:
+                    p = Combination.sweep(model, {'r_w': np.array([u]),
+                                                  'p_f': np.array([v])})[k]
+                    self.assertAlmostEqual(float(p[0, 0]), 0.5, places=6)
+        with self.assertRaises(ValueError):
+            Combination.contour(model, 0.5, axes, output='q_c')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#
+# Tests the headless figure build
+#
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from ebola_model.figures import __main__ as figures
+
+
+class TestBuild(unittest.TestCase):
+    """
+    Tests that the build command writes figures and skips unchanged ones.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_build(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = figures.main(['build', 'figure3a', '-o',
+                                 self.directory.name, '-j', '1'] + list(args))
+        self.assertEqual(code, 0)
+        return output.getvalue().strip()
+
+    def test_build(self):
+        # Built once, skipped while the inputs are unchanged, and rebuilt
+        # when forced or when the recorded fingerprint differs
+        directory = os.path.join(self.directory.name, 'figure3a')
+        self.assertEqual(self.run_build(), 'figure3a: built')
+        self.assertEqual(sorted(os.listdir(directory)),
+                         ['data.npz', 'figure3a.pdf', 'figure3a.png',
+                          'inputs.sha256'])
+        with open(os.path.join(directory, 'inputs.sha256')) as file:
+            self.assertEqual(file.read(), figures.fingerprint('figure3a'))
+        data = os.path.join(directory, 'data.npz')
+        mtime = os.stat(data).st_mtime_ns
+        self.assertEqual(self.run_build(), 'figure3a: unchanged')
+        self.assertEqual(os.stat(data).st_mtime_ns, mtime)
+        self.assertEqual(self.run_build('-f'), 'figure3a: built')
+        with open(os.path.join(directory, 'inputs.sha256'), 'w') as file:
+            file.write('0'*64)
+        self.assertEqual(self.run_build(), 'figure3a: built')
+
+    def test_unknown(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                figures.main(['build', 'figure9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#
+# Tests that evaluations on process pools match serial evaluations
+#
+import os
+import unittest
+import numpy as np
+from scipy.stats import qmc
+
+from ebola_model.functions import gsa
+from ebola_model.functions.intervention_combinations import Combination
+from ebola_model.functions.probability import PMO, Telemetry
+
+
+def counts(telemetry):
+    """Function returns the counts of a Telemetry without the timings.
+    """
+    return {method: (c['points'], c['solved'], c['n_iter'])
+            for method, c in telemetry.counts.items()}
+
+
+class TestParallel(unittest.TestCase):
+    """
+    Tests serial and pool evaluations for bit-identity.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = PMO(0.7, 0.4/0.7, 173/27, 28/173, 5.9, 0.25, 4, 0.2)
+        cls.X = qmc.scale(qmc.Sobol(5, seed=0).random(512), [0, 0, 0, 0, 0],
+                          [56/27, 1, 0.5, 1.6*28/27, 1])
+
+    def test_evaluate(self):
+        serial, pool = Telemetry(), Telemetry()
+        Y = gsa.Model.evaluate(self.X, telemetry=serial)
+        Y_pool = gsa.Model.evaluate(self.X, n_workers=2, telemetry=pool)
+        np.testing.assert_array_equal(Y, Y_pool)
+        self.assertEqual(counts(serial), counts(pool))
+        self.assertEqual(sum(c[0] for c in counts(pool).values()),
+                         len(self.X))
+        h = np.linspace(0, 1, 5)
+        model = gsa.Model()
+        Y = model.evaluate_h(h, self.X[:, :4])
+        Y_pool = model.evaluate_h(h, self.X[:, :4], n_workers=2)
+        np.testing.assert_array_equal(Y, Y_pool)
+        self.assertEqual(Y_pool.shape, (5, len(self.X)))
+
+    def test_saltelli(self):
+        # Saltelli design of 4 variables, in blocks of 6 rows
+        A, B = self.X[:64, :4], self.X[64:128, :4]
+        blocks = [A]
+        for i in range(4):
+            AB = A.copy()
+            AB[:, i] = B[:, i]
+            blocks.append(AB)
+        blocks.append(B)
+        X = np.stack(blocks, axis=1).reshape(-1, 4)
+        h = np.linspace(0, 1, 5)
+        model = gsa.Model()
+        Y = model.evaluate_h(h, X, saltelli=True, outputs=('p_c', 'p_h'))
+        Y_pool = model.evaluate_h(h, X, saltelli=True, n_workers=2,
+                                  outputs=('p_c', 'p_h'))
+        np.testing.assert_array_equal(Y, Y_pool)
+        Y_cold = model.evaluate_h(h, X, outputs=('p_c', 'p_h'))
+        np.testing.assert_allclose(Y, Y_cold, rtol=0, atol=1e-10)
+        # Warm-started from the tangent predictions
+        Y_warm = model.evaluate_h(h, X, method='anderson', saltelli=True,
+                                  outputs=('p_c', 'p_h'))
+        np.testing.assert_allclose(Y_warm, Y_cold, rtol=0, atol=1e-10)
+
+    def test_saltelli_blocks(self):
+        # 38 rows are not whole blocks of 7 rows for 5 variables
+        for n_workers in (1, 2):
+            with self.assertRaises(ValueError):
+                gsa.Model.evaluate(self.X[:38], n_workers=n_workers,
+                                   saltelli=True)
+
+    def test_sweep(self):
+        axes = {'p_f': np.linspace(0, 1, 7), 'r_w': np.linspace(0, 3, 301)}
+        shm = '/dev/shm'
+        segments = set(os.listdir(shm)) if os.path.isdir(shm) else set()
+        serial, pool = Telemetry(), Telemetry()
+        result = Combination.sweep(self.model, axes, gradients=True,
+                                   telemetry=serial)
+        result_pool = Combination.sweep(self.model, axes, gradients=True,
+                                        n_workers=2, chunk_size=100,
+                                        telemetry=pool)
+        for a, b in zip(result, result_pool):
+            np.testing.assert_array_equal(a, b)
+        self.assertEqual(counts(serial), counts(pool))
+        # The shared segments are unlinked once the results are copied out
+        if os.path.isdir(shm):
+            self.assertEqual(set(os.listdir(shm)), segments)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+#
+# Tests the solvers of the extinction equations
+#
+import unittest
+import numpy as np
+from scipy.optimize import root
+from scipy.stats import qmc
+
+from ebola_model.functions import probability as p
+
+
+def sobol_points(n, seed=0):
+    """Function returns n points of the global sensitivity analysis ranges
+    as the variables (r_c, p_b, r_f, r_v, r_w, h) of the model.
+    """
+    X = qmc.scale(qmc.Sobol(5, seed=seed).random(n), [0, 0, 0, 0, 0],
+                  [56/27, 1, 0.5, 1.6*28/27, 1])
+    return (X[:, 0], 0.7*X[:, 1], np.full(n, 5.9), X[:, 2], X[:, 3],
+            X[:, 4])
+
+
+def critical_points(offsets):
+    """Function returns points whose reproduction number is 1 + offsets, by
+    bisecting on r_c with the other variables fixed.
+    """
+    r_c_0, r_c_1 = np.zeros(len(offsets)), np.full(len(offsets), 10.0)
+    target = 1 + np.asarray(offsets)
+    for _ in range(200):
+        r_c = (r_c_0 + r_c_1)/2
+        above = p.reproduction_number(r_c, 0.2, 5.9, 0.2, 0.3, 0.5) > target
+        r_c_0, r_c_1 = np.where(above, r_c_0, r_c), np.where(above, r_c, r_c_1)
+    return r_c_1, 0.2, 5.9, 0.2, 0.3, 0.5
+
+
+class TestPmoBatch(unittest.TestCase):
+    """
+    Tests the batch solver against scipy and across methods.
+    """
+    def test_root(self):
+        # Agrees with the Levenberg-Marquardt solve the model used before
+        theta = sobol_points(256)
+        solution = p.pmo_batch(*theta)
+        for k in range(256):
+            args = tuple(v[k] for v in theta)
+            reference = root(p.residual, [0.5, 0.5, 0.5], args=args,
+                             jac=p.jacobian, method='lm',
+                             options={'xtol': 1e-14})
+            self.assertTrue(reference.success)
+            np.testing.assert_allclose(
+                [solution.q_c[k], solution.q_f[k], solution.q_h[k]],
+                reference.x, rtol=0, atol=1e-8)
+        self.assertTrue(np.all(solution.converged))
+        self.assertLess(np.max(solution.residual), 1e-10)
+
+    def test_methods(self):
+        # Every method finds the same minimal root
+        theta = sobol_points(512, seed=1)
+        reference = p.pmo_batch(*theta, method='newton')
+        for method in ('auto', 'fixed_point', 'anderson', 'reduced', 'lm',
+                       'numba'):
+            solution = p.pmo_batch(*theta, method=method, polish=True)
+            self.assertTrue(np.all(solution.converged), method)
+            for q, q_ref in ((solution.q_c, reference.q_c),
+                             (solution.q_f, reference.q_f),
+                             (solution.q_h, reference.q_h)):
+                np.testing.assert_allclose(q, q_ref, rtol=0, atol=1e-10,
+                                           err_msg=method)
+
+    def test_subcritical(self):
+        # Points are skipped exactly where the reproduction number is below 1
+        theta = sobol_points(1024, seed=2)
+        solution = p.pmo_batch(*theta)
+        below = p.reproduction_number(*theta) < 1
+        np.testing.assert_array_equal(solution.skipped, below)
+        np.testing.assert_array_equal(solution.p_c[below], 0)
+        self.assertTrue(np.all(solution.p_c[~below] > 0))
+
+    def test_near_critical(self):
+        # Points just above the threshold are solved by every rung of the
+        # ladder, and points just below it give no outbreak
+        offsets = np.concatenate([-np.logspace(-3, -8, 6),
+                                  np.logspace(-8, -3, 6)])
+        theta = critical_points(offsets)
+        reference = p.pmo_batch(*theta, method='auto')
+        self.assertTrue(np.all(reference.converged))
+        np.testing.assert_array_equal(reference.p_c[:6], 0)
+        self.assertTrue(np.all(reference.p_c[6:] > 0))
+        self.assertTrue(np.all(np.diff(reference.p_c[6:]) > 0))
+        for method in p.LADDER:
+            solution = p.pmo_batch(*theta, method=method)
+            self.assertTrue(np.all(solution.converged), method)
+            np.testing.assert_allclose(solution.p_c, reference.p_c, rtol=0,
+                                       atol=1e-7, err_msg=method)
+
+    def test_failure(self):
+        # A method that cannot solve the points within its iteration cap
+        # leaves them unconverged, and the ladder raises if nothing solves
+        theta = sobol_points(64, seed=3)
+        solution = p.pmo_batch(*theta, method='fixed_point', max_iter=2)
+        self.assertFalse(np.all(solution.converged))
+        self.assertTrue(np.any(solution.method == 'failed'))
+        r_c = theta[0].copy()
+        r_c[5] = np.nan
+        with self.assertRaises(p.ConvergenceError):
+            p.pmo_batch(r_c, *theta[1:], method='auto')
+
+
+class TestDerivatives(unittest.TestCase):
+    """
+    Tests the implicit function theorem derivatives.
+    """
+    def test_tangent(self):
+        # Agrees with central differences in every variable
+        theta = [v[:32] for v in sobol_points(256, seed=4)]
+        solution = p.pmo_batch(*theta)
+        theta = [v[~solution.skipped] for v in theta]
+        solution = p.pmo_batch(*theta)
+        s = np.array([solution.q_c, solution.q_f, solution.q_h])
+        ds = p.tangent(s, *theta)
+        for j in range(6):
+            step = 1e-6*np.maximum(np.abs(theta[j]), 1)
+            plus, minus = list(theta), list(theta)
+            plus[j], minus[j] = theta[j] + step, theta[j] - step
+            s_plus = p.pmo_batch(*plus, skip_subcritical=False)
+            s_minus = p.pmo_batch(*minus, skip_subcritical=False)
+            difference = (np.array([s_plus.q_c, s_plus.q_f, s_plus.q_h]) -
+                          np.array([s_minus.q_c, s_minus.q_f, s_minus.q_h])
+                          )/(2*step)
+            np.testing.assert_allclose(ds[:, j], difference, rtol=1e-5,
+                                       atol=1e-6)
+        # Directional derivatives are the derivatives contracted with the
+        # direction
+        direction = np.random.default_rng(5).normal(
+            size=(6, len(theta[0])))
+        np.testing.assert_allclose(
+            p.tangent(s, *theta, direction=direction),
+            np.einsum('ij...,j...->i...', ds, direction), rtol=1e-12,
+            atol=1e-12)
+
+
+class TestSweep(unittest.TestCase):
+    """
+    Tests the continuation solver.
+    """
+    def test_sweep(self):
+        # Agrees with the batch solver, including across the threshold
+        r_c = np.linspace(0, 4, 400)[:, np.newaxis]
+        r_w = np.linspace(0, 3, 30)[np.newaxis, :]
+        sweep = p.pmo_sweep(r_c, 0.2, 5.9, 0.1, r_w, 0.4)
+        batch = p.pmo_batch(r_c, 0.2, 5.9, 0.1, r_w, 0.4)
+        self.assertTrue(np.all(sweep.converged))
+        np.testing.assert_array_equal(sweep.skipped, batch.skipped)
+        np.testing.assert_allclose(sweep.p_c, batch.p_c, rtol=0, atol=1e-10)
+        np.testing.assert_allclose(sweep.p_h, batch.p_h, rtol=0, atol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#
+# Tests the Sobol' sensitivity indices with adaptive sample sizes
+#
+import unittest
+import numpy as np
+
+from ebola_model.functions import gsa, sobol
+
+
+class TestProgressive(unittest.TestCase):
+    """
+    Tests that growing samples match one-shot samples of the final size.
+    """
+    def test_indices(self):
+        # Doubling from 64 to 256 base samples reuses the earlier
+        # evaluations and gives the indices of 256 base samples at once
+        from SALib.analyze.sobol import analyze
+        from SALib.sample.sobol import sample
+
+        problem, Si, n = sobol.progressive_indices(conf=0, N=64, N_max=256,
+                                                   seed=3)
+        self.assertEqual(n, 256*7)
+        X = sample(sobol._problem(), 256, calc_second_order=False, seed=3)
+        reference = analyze(sobol._problem(), gsa.Model.evaluate(X),
+                            calc_second_order=False, print_to_console=False,
+                            seed=3)
+        for key in ('S1', 'ST', 'S1_conf', 'ST_conf'):
+            np.testing.assert_allclose(Si[key], reference[key], rtol=1e-12,
+                                       atol=1e-12, err_msg=key)
+        _, _, n = sobol.progressive_indices(conf=1, N=64, seed=3)
+        self.assertEqual(n, 64*7)
+        with self.assertRaises(ValueError):
+            sobol.progressive_indices(N=100)
+
+    def test_h_indices(self):
+        # One table row per value of h, and one table per output from the
+        # same solves
+        h = np.array([0.2, 0.8])
+        df, st, n = sobol.progressive_h_indices(conf=0, N=32, N_max=64, h=h,
+                                                seed=4)
+        self.assertEqual(n, 64*6)
+        self.assertEqual(df.shape, (2, 4))
+        self.assertEqual(st.shape, (2, 4))
+        dfs, sts, _ = sobol.progressive_h_indices(
+            conf=0, N=32, N_max=64, h=h, seed=4, outputs=('p_c', 'p_h'))
+        self.assertEqual(sorted(dfs), ['p_c', 'p_h'])
+        self.assertEqual(sorted(sts), ['p_c', 'p_h'])
+        np.testing.assert_array_equal(dfs['p_c'], df)
+        np.testing.assert_array_equal(sts['p_c'], st)
+
+
+if __name__ == '__main__':
+    unittest.main()
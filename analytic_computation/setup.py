@@ -56,5 +56,8 @@ setup(
             'pytest',
             'pytest-cov',
         ],
+        'numba': [
+            'numba',
+        ],
     },
 )
\ No newline at end of file